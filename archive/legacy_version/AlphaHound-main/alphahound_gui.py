@@ -1,18 +1,30 @@
 import serial
 import serial.tools.list_ports
 import threading
+import io
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import time
-import csv
+import re
+import select
+import sys
+import numpy as np
 import matplotlib
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
 
 matplotlib.use("TkAgg")
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
+N_CHANNELS = 1024
+DOSE_HISTORY_CAPACITY = 86400  # 24 h of samples at the 1 Hz dose poll
+# Serial fds are selectable everywhere except Windows
+_USE_SELECT = sys.platform != 'win32'
+# Scientific-notation token: captures the fractional digits and the exponent
+_SCI_NUMBER = re.compile(r'^\s*[+-]?(?=\.?\d)\d*(?:\.(\d*))?[eE]([+-]?\d+)\s*$')
+# A "count,energy" spectrum row; malformed rows must not count toward the N_CHANNELS rows of a block
+_SPECTRUM_ROW = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\s*,\s*[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
 class GammaInterface:
     def __init__(self, master):
         self.master = master
@@ -25,10 +37,19 @@ class GammaInterface:
         self.serial_thread = None
         self.serial_stop = threading.Event()
         self.serial_conn = None
-        self.writer_lock = threading.Lock()
-
-        self.dose_history = []
-        self.spectrum = []
+        self._serial_lock = threading.RLock()
+        self._dose_poll_id = None
+        self._ports = None
+        self._port_scan_active = False
+        self._scanned_ports = None
+
+        # Dose log: circular buffer of epoch seconds / dose values
+        self._dose_times = np.empty(DOSE_HISTORY_CAPACITY, dtype=np.int64)
+        self._dose_vals = np.empty(DOSE_HISTORY_CAPACITY, dtype=np.float64)
+        self._dose_head = 0
+        self._dose_count = 0
+        self._dose_sum = 0.0
+        self.spectrum = np.empty((0, 2))
         self.collect_spectrum = False
         self.gamma_manual_get = False
 
@@ -38,7 +59,7 @@ class GammaInterface:
         self.timed_value = 0
 
         self.gamma_auto_running = False
-        self.gamma_auto_thread = None
+        self._auto_gamma_id = None
 
         self._setup_ui()
         self._populate_com_ports()
@@ -101,10 +122,63 @@ class GammaInterface:
         self.ax.set_xlabel("Channel"); self.ax.set_ylabel("Count"); self.ax.set_title("Gamma Spectrum")
         self.canvas = FigureCanvasTkAgg(self.fig, master=frame_plot)
         self.canvas.get_tk_widget().pack(fill='x', expand=True)
-        self._draw_blank_spectrum()
+        # One persistent step artist, updated in place on every refresh
+        self._spec_line, = self.ax.step(np.arange(N_CHANNELS), np.zeros(N_CHANNELS), where='mid', color='black')
+        self.ax.set_xlim(-0.5, N_CHANNELS - 0.5)
+        self.ax.set_ylim(0, 1)
+        self.canvas.draw()
+
+        # Skip spectrum renders while the window is minimized; catch up once on restore
+        self._visible = True
+        self._redraw_pending = False
+        self.master.bind('<Map>', self._on_map, add='+')
+        self.master.bind('<Unmap>', self._on_unmap, add='+')
+
+    def _on_map(self, event):
+        if event.widget is not self.master:
+            return
+        self._visible = True
+        if self._redraw_pending:
+            self._redraw_pending = False
+            self._draw_spectrum()
+
+    def _on_unmap(self, event):
+        if event.widget is self.master:
+            self._visible = False
 
     def _populate_com_ports(self):
-        ports = [port.device for port in serial.tools.list_ports.comports()]
+        # Port enumeration can stall for hundreds of ms (WMI/sysfs), so keep it off the Tk thread
+        if self._port_scan_active:
+            return
+        self._port_scan_active = True
+        self._scanned_ports = None
+        threading.Thread(target=self._scan_ports_bg, daemon=True).start()
+        # Scheduled from the Tk thread, so this also works when the scan ends before mainloop starts
+        self.master.after(50, self._poll_port_scan)
+
+    def _scan_ports_bg(self):
+        ports = []
+        try:
+            ports = [port.device for port in serial.tools.list_ports.comports()]
+        except Exception:
+            pass
+        finally:
+            # Picked up by _poll_port_scan; after() from this thread fails if mainloop isn't running yet
+            self._scanned_ports = ports
+
+    def _poll_port_scan(self):
+        """Apply the background scan result once it is ready (runs on the Tk thread)."""
+        ports = self._scanned_ports
+        if ports is None:
+            self.master.after(50, self._poll_port_scan)
+            return
+        self._port_scan_active = False
+        self._apply_port_list(ports)
+
+    def _apply_port_list(self, ports):
+        if ports == self._ports:
+            return  # unchanged; keep the user's selection
+        self._ports = ports
         self.combobox_ports['values'] = ports
         if ports:
             self.combobox_ports.current(0)
@@ -117,13 +191,15 @@ class GammaInterface:
             messagebox.showwarning("No Port", "Please select a serial port.")
             return
         try:
-            self.serial_conn = serial.Serial(port, 9600, timeout=0.2)
+            with self._serial_lock:
+                self.serial_conn = serial.Serial(port, 9600, timeout=1.0)
             self.status_var.set("Status: Connected to " + port)
             self.button_connect.config(state='disabled')
             self.button_disconnect.config(state='normal')
             self.serial_stop.clear()
             self.serial_thread = threading.Thread(target=self.serial_worker, daemon=True)
             self.serial_thread.start()
+            self._poll_dose()
         except Exception as e:
             self.status_var.set(f"Status: Connection Failed ({e})")
             self.serial_conn = None
@@ -132,10 +208,21 @@ class GammaInterface:
         self.abort_timed_count()
         self.stop_auto_gamma(force=True)
         self.serial_stop.set()
+        if self._dose_poll_id is not None:
+            self.master.after_cancel(self._dose_poll_id)
+            self._dose_poll_id = None
+        # Let the worker leave its blocking read before the port is closed under it
         if self.serial_conn:
-            try: self.serial_conn.close()
+            try: self.serial_conn.cancel_read()
             except: pass
-        self.serial_conn = None
+        if self.serial_thread and self.serial_thread is not threading.current_thread():
+            self.serial_thread.join(timeout=1.0)
+        self.serial_thread = None
+        with self._serial_lock:
+            if self.serial_conn:
+                try: self.serial_conn.close()
+                except: pass
+            self.serial_conn = None
         self.status_var.set("Status: Disconnected")
         self.button_connect.config(state='normal')
         self.button_disconnect.config(state='disabled')
@@ -159,97 +246,151 @@ class GammaInterface:
         self.entry_time.config(state='normal')
 
     def serial_worker(self):
-        buffer = b''
-        spectrum_tmp = []
+        buffer = bytearray()
+        spec_bytes = bytearray()
+        spec_rows = 0
         expecting_spectrum = False
         try:
-            last_dose_time = 0
             while not self.serial_stop.is_set():
-                if self.serial_conn.in_waiting:
-                    data = self.serial_conn.read(self.serial_conn.in_waiting)
-                    buffer += data
-                    while b'\n' in buffer:
-                        line, buffer = buffer.split(b'\n', 1)
-                        line = line.decode(errors='ignore').strip()
-                        if line == "Comp":
-                            spectrum_tmp = []
-                            expecting_spectrum = True
-                            self.status_var.set("Status: Spectrum collecting...")
-                        elif expecting_spectrum and ',' in line:
-                            try:
-                                count, energy = line.split(',', 1)
-                                count = float(count)
-                                energy = float(energy)
-                                spectrum_tmp.append((count, energy))
-                            except ValueError:
-                                continue
-                            if len(spectrum_tmp) >= 1024:
-                                self.spectrum = spectrum_tmp.copy()
-                                self._draw_spectrum()
-                                # Handle spectrum ending:
-                                if self.timed_acquire_active:
-                                    self.master.after(0, self.timed_count_completed)
-                                elif self.gamma_auto_running:
-                                    # Just update plot, nothing to do.
-                                    pass
-                                elif self.gamma_manual_get:
-                                    self.master.after(0, self.manual_gamma_completed)
-                                else:
-                                    # Shouldn't happen, just show exported spectrum
-                                    pass
-                                expecting_spectrum = False
-                        elif expecting_spectrum and not line:
+                if _USE_SELECT:
+                    # Sleep in the kernel until the port has data; the timeout keeps stop checks prompt
+                    ready, _, _ = select.select([self.serial_conn], [], [], 0.5)
+                    if not ready:
+                        continue
+                # Block for one byte, then drain whatever else the driver has queued;
+                # in_waiting alone can read 0 or stale on some drivers
+                first = self.serial_conn.read(1)
+                if not first:
+                    continue
+                buffer += first
+                buffer += self.serial_conn.read(self.serial_conn.in_waiting)
+                while (idx := buffer.find(b'\n')) >= 0:
+                    raw = bytes(buffer[:idx + 1])
+                    del buffer[:idx + 1]
+                    line = raw.decode(errors='ignore').strip()
+                    if line == "Comp":
+                        spec_bytes = bytearray()
+                        spec_rows = 0
+                        expecting_spectrum = True
+                        self._ui(self.status_var.set, "Status: Spectrum collecting...")
+                    elif expecting_spectrum and ',' in line:
+                        if not _SPECTRUM_ROW.fullmatch(line):
+                            continue
+                        spec_bytes += raw
+                        spec_rows += 1
+                        if spec_rows >= N_CHANNELS:
+                            self.spectrum = self._parse_spectrum_block(spec_bytes)
+                            self._ui(self._draw_spectrum)
+                            # Handle spectrum ending:
+                            if self.timed_acquire_active:
+                                self._ui(self.timed_count_completed)
+                            elif self.gamma_auto_running:
+                                # Just update plot, nothing to do.
+                                pass
+                            elif self.gamma_manual_get:
+                                self._ui(self.manual_gamma_completed)
+                            else:
+                                # Shouldn't happen, just show exported spectrum
+                                pass
+                            expecting_spectrum = False
+                    elif expecting_spectrum and not line:
+                        continue
+                    elif not expecting_spectrum and ',' not in line:
+                        try:
+                            dose = float(line)
+                            self._ui(self._handle_dose, dose)
+                        except ValueError:
                             continue
-                        elif not expecting_spectrum and ',' not in line:
-                            try:
-                                dose = float(line)
-                                self._handle_dose(dose)
-                            except ValueError:
-                                continue
-                curr = time.time()
-                if self.serial_conn and curr - last_dose_time >= 1.0:
-                    self._serial_write(b"D"); last_dose_time = curr
-                time.sleep(0.05)
         except Exception as e:
-            self.status_var.set(f"Status: Serial error: {str(e)}")
-            self.disconnect_serial()
+            if not self.serial_stop.is_set():
+                self._ui(self.status_var.set, f"Status: Serial error: {str(e)}")
+                self._ui(self.disconnect_serial)
+
+    def _poll_dose(self):
+        """Request a dose reading once a second while connected (runs on the Tk thread)."""
+        if not self.serial_conn:
+            self._dose_poll_id = None
+            return
+        self._serial_write(b"D")
+        self._dose_poll_id = self.master.after(1000, self._poll_dose)
+
+    def _ui(self, fn, *args):
+        """Run fn(*args) on the Tk main thread; Tk widgets must not be touched from worker threads."""
+        try:
+            self.master.after(0, fn, *args)
+        except (tk.TclError, RuntimeError):
+            pass  # window already destroyed
+
+    def _parse_spectrum_block(self, block):
+        """Parse the buffered "count,energy" lines of a spectrum into a (channels, 2) array."""
+        arr = np.genfromtxt(io.BytesIO(bytes(block)), delimiter=',', usecols=(0, 1), dtype=np.float64)
+        # Rows were validated before buffering, so the fresh contiguous array is returned as is
+        return arr.reshape(-1, 2)
 
     def _serial_write(self, data):
         if not self.serial_conn:
             return
         try:
-            with self.writer_lock:
-                self.serial_conn.write(data)
+            with self._serial_lock:
+                if self.serial_conn:
+                    self.serial_conn.write(data)
         except Exception as e:
-            self.status_var.set("Status: Serial error: " + str(e))
-            self.disconnect_serial()
+            self._ui(self.status_var.set, "Status: Serial error: " + str(e))
+            self._ui(self.disconnect_serial)
 
     def _handle_dose(self, dose):
         self.dose_var.set(f"Dose Rate: {dose} uRem")
-        entry = {'time': time.strftime("%Y-%m-%d %H:%M:%S"), 'dose': dose}
-        self.dose_history.append(entry)
-        avg = sum([e['dose'] for e in self.dose_history]) / len(self.dose_history)
+        i = self._dose_head
+        if self._dose_count == DOSE_HISTORY_CAPACITY:
+            self._dose_sum -= self._dose_vals[i]
+        else:
+            self._dose_count += 1
+        self._dose_times[i] = int(time.time())
+        self._dose_vals[i] = dose
+        self._dose_head = (i + 1) % DOSE_HISTORY_CAPACITY
+        self._dose_sum += dose
+        avg = self._dose_sum / self._dose_count
         self.avg_var.set(f"Dose Average: {avg:.2f} uRem")
 
     def clear_dose_history(self):
-        self.dose_history = []
+        self._dose_head = 0
+        self._dose_count = 0
+        self._dose_sum = 0.0
         self.avg_var.set("Dose Average: N/A uRem")
         self.dose_var.set("Dose Rate: N/A uRem")
         messagebox.showinfo("Dose Rate Data", "Dose rate data cleared.")
 
+    def _dose_log(self):
+        """Return (times, doses) of the buffered dose log in chronological order."""
+        n = self._dose_count
+        if n < DOSE_HISTORY_CAPACITY:
+            return self._dose_times[:n], self._dose_vals[:n]
+        h = self._dose_head
+        return (np.concatenate((self._dose_times[h:], self._dose_times[:h])),
+                np.concatenate((self._dose_vals[h:], self._dose_vals[:h])))
+
+    def _format_dose_times(self, times):
+        """Format epoch seconds as local "YYYY-MM-DD HH:MM:SS" strings in one vectorized pass."""
+        utc_offset = time.localtime(int(times[0])).tm_gmtoff
+        if time.localtime(int(times[-1])).tm_gmtoff != utc_offset:
+            # Log spans a DST change; fall back to per-sample conversion
+            return np.array([time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)) for t in times.tolist()])
+        local = (times + utc_offset).astype('datetime64[s]')
+        return np.char.replace(np.datetime_as_string(local, unit='s'), 'T', ' ')
+
     def export_dose_csv(self):
-        if not self.dose_history:
+        if not self._dose_count:
             messagebox.showinfo("Dose Rate Data", "No dose data to export.")
             return
         filename = filedialog.asksaveasfilename(defaultextension='.csv',
                             filetypes=[("CSV Files", "*.csv")],
                             title="Save Dose Rate CSV")
         if not filename: return
-        with open(filename, 'w', newline='') as f:
-            w = csv.writer(f)
-            w.writerow(["Time", "Dose Rate"])
-            for row in self.dose_history:
-                w.writerow([row['time'], row['dose']])
+        times, doses = self._dose_log()
+        stamps = self._format_dose_times(times)
+        with open(filename, 'w', newline='', buffering=1 << 20) as f:
+            np.savetxt(f, np.column_stack((stamps, doses.astype(str))), fmt='%s',
+                       delimiter=',', header="Time,Dose Rate", comments='')
         messagebox.showinfo("Dose Rate Data", f"CSV saved: {filename}")
 
     # def export_dose_n42(self):
@@ -280,7 +421,7 @@ class GammaInterface:
         if self.timed_acquire_active:
             self.abort_timed_count(forced=True)
         self.gamma_manual_get = True
-        self.spectrum = []
+        self.spectrum = np.empty((0, 2))
         self._disable_during_operation(spectrum=True, auto=True, timed=True)
         self.status_var.set("Status: Waiting for spectrum...")
         self._serial_write(b'G')
@@ -298,7 +439,7 @@ class GammaInterface:
             messagebox.showinfo("Not Connected", "Connect to the device first.")
             return
         self._serial_write(b'W')
-        self.spectrum = []
+        self.spectrum = np.empty((0, 2))
         self._draw_blank_spectrum()
         self.status_var.set("Status: Clear command sent (W)")
 
@@ -325,6 +466,9 @@ class GammaInterface:
 
     def stop_auto_gamma(self, force=False):
         self.gamma_auto_running = False
+        if self._auto_gamma_id is not None:
+            self.master.after_cancel(self._auto_gamma_id)
+            self._auto_gamma_id = None
         self.button_auto_gamma.config(text="Start Auto Gamma View")
         self._enable_normal_ops()
         if not self.timed_acquire_active:
@@ -333,14 +477,15 @@ class GammaInterface:
             self.status_var.set("Status: Auto Gamma stopped.")
 
     def _start_auto_gamma(self):
-        def auto_loop():
-            while self.gamma_auto_running and self.serial_conn:
-                self._serial_write(b'G')
-                for _ in range(50):
-                    if not self.gamma_auto_running: break
-                    time.sleep(0.1)
-        self.gamma_auto_thread = threading.Thread(target=auto_loop, daemon=True)
-        self.gamma_auto_thread.start()
+        self._auto_gamma_id = self.master.after(0, self._auto_gamma_tick)
+
+    def _auto_gamma_tick(self):
+        # Request a spectrum every 5 s from the Tk event loop; cancelled by stop_auto_gamma
+        if not (self.gamma_auto_running and self.serial_conn):
+            self._auto_gamma_id = None
+            return
+        self._serial_write(b'G')
+        self._auto_gamma_id = self.master.after(5000, self._auto_gamma_tick)
     #========== TIMED COUNT MUTEX LOGIC ==========
 
     def start_timed_count(self):
@@ -371,17 +516,16 @@ class GammaInterface:
     def timed_count_thread(self, minutes):
         total_secs = int(minutes*60)
         for t in range(total_secs,0,-1):
-            if self.timed_acquire_abort.is_set():
+            self.master.after(0, self.label_timer.config, {"text":f"Time remaining: {t//60:02d}:{t%60:02d}"})
+            # Sleeps the full second unless abort_timed_count sets the event, which wakes it at once
+            if self.timed_acquire_abort.wait(1):
                 self.master.after(0, self.label_timer.config, {"text": " "})
                 self.master.after(0, self.status_var.set, "Status: Abort: acquiring spectrum...")
                 self._serial_write(b'G')
                 return
-            self.master.after(0, self.label_timer.config, {"text":f"Time remaining: {t//60:02d}:{t%60:02d}"})
-            time.sleep(1)
         self.master.after(0, self.label_timer.config, {"text": " "})
-        if not self.timed_acquire_abort.is_set():
-            self.master.after(0, self.status_var.set, "Status: Timed count finished, acquiring spectrum...")
-            self._serial_write(b'G')
+        self.master.after(0, self.status_var.set, "Status: Timed count finished, acquiring spectrum...")
+        self._serial_write(b'G')
 
     def abort_timed_count(self, forced=False):
         if self.timed_acquire_active:
@@ -404,7 +548,7 @@ class GammaInterface:
     #========== END MUTEX LOGIC ==========
 
     def export_gamma_csv(self):
-        if not self.spectrum:
+        if not len(self.spectrum):
             messagebox.showinfo("No Data", "No gamma spectrum data available.")
             return
         include_energy = self.checkvar_energy_csv.get() == 1
@@ -412,21 +556,15 @@ class GammaInterface:
                             filetypes=[("CSV Files", "*.csv")],
                             title="Save Gamma Spectrum CSV")
         if not filename: return
-        with open(filename, 'w', newline='') as f:
-            w = csv.writer(f)
+        with open(filename, 'w', newline='', buffering=1 << 20) as f:
             if include_energy:
-                w.writerow(["Data", "Energy"])
+                np.savetxt(f, self.spectrum, fmt='%.10g', delimiter=',', header="Data,Energy", comments='')
             else:
-                w.writerow(["Data"])
-            for count, energy in self.spectrum:
-                if include_energy:
-                    w.writerow([count, energy])
-                else:
-                    w.writerow([count])
+                np.savetxt(f, self.spectrum[:, 0:1], fmt='%.10g', delimiter=',', header="Data", comments='')
         messagebox.showinfo("Export", f"CSV saved: {filename}")
 
     def export_gamma_n42(self):
-        if not self.spectrum:
+        if not len(self.spectrum):
             messagebox.showinfo("No Data", "No gamma spectrum data available.")
             return
 
@@ -435,8 +573,8 @@ class GammaInterface:
                                                 title="Save Gamma Spectrum N42")
         if not filename: return
 
-        spectrum_counts = [int(count) for count, energy in self.spectrum]
-        energies = [float(energy) for count, energy in self.spectrum]
+        spectrum_counts = self.spectrum[:, 0].astype(np.int64)
+        energies = self.spectrum[:, 1]
         n_channels = len(spectrum_counts)
 
         ns = "http://physics.nist.gov/N42/2006/N42"
@@ -462,11 +600,11 @@ class GammaInterface:
         cal_fit = ET.SubElement(energy_cal, "CalibrationEquation")
         cal_fit.text = "List"
         channel_energies = ET.SubElement(energy_cal, "ChannelEnergies")
-        channel_energies.text = " ".join(f"{e:.5f}" for e in energies)
+        channel_energies.text = " ".join(np.char.mod("%.5f", energies))
 
         # ChannelData
         channeldata = ET.SubElement(spectrum, "ChannelData", NumberOfChannels=str(n_channels))
-        channeldata.text = " ".join(str(int(c)) for c in spectrum_counts)
+        channeldata.text = " ".join(spectrum_counts.astype(str))
 
         # Optional meta
         spectrum_time = ET.SubElement(spectrum, "LiveTime")
@@ -474,28 +612,25 @@ class GammaInterface:
         sptype = ET.SubElement(spectrum, "SpectrumType")
         sptype.text = "PHA"
 
-        xmlstr = minidom.parseString(ET.tostring(root)).toprettyxml(indent="  ")
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(xmlstr)
+        ET.indent(root, space="  ")
+        ET.ElementTree(root).write(filename, encoding="utf-8", xml_declaration=True)
         messagebox.showinfo("Export", f"N42 XML saved: {filename}")
 
     def _draw_spectrum(self):
-        self.ax.cla()
-        self.ax.set_xlabel("Channel")
-        self.ax.set_ylabel("Count")
-        self.ax.set_title("Gamma Spectrum")
-        if self.spectrum:
-            channels = list(range(len(self.spectrum)))
-            counts = [count for count,energy in self.spectrum]
-            self.ax.bar(channels, counts, color='black', alpha=0.6, width=1.0)
-        self.canvas.draw()
+        if not len(self.spectrum):
+            return
+        if not self._visible:
+            self._redraw_pending = True
+            return
+        counts = self.spectrum[:, 0]
+        self._spec_line.set_data(np.arange(len(counts)), counts)
+        self.ax.set_ylim(0, max(counts.max() * 1.05, 1))
+        self.canvas.draw_idle()
 
     def _draw_blank_spectrum(self):
-        self.ax.cla()
-        self.ax.set_xlabel("Channel")
-        self.ax.set_ylabel("Count")
-        self.ax.set_title("Gamma Spectrum")
-        self.canvas.draw()
+        self._spec_line.set_data(np.arange(N_CHANNELS), np.zeros(N_CHANNELS))
+        self.ax.set_ylim(0, 1)
+        self.canvas.draw_idle()
 
     def send_custom_command(self):
         if not self.serial_conn:
@@ -513,16 +648,16 @@ class GammaInterface:
         self.entry_command.delete(0, tk.END)
 
     def _normalize_number(self, token):
+        m = _SCI_NUMBER.match(token)
         try:
             num = float(token)
-            if "e" in token.lower():
-                coef, exp = token.lower().split('e')
-                places = abs(int(exp)) + (len(coef.split(".")[1]) if '.' in coef else 0)
-                return f"{num:.{places}f}"
-            else:
-                return str(num)
-        except:
+        except ValueError:
             return token
+        if m:
+            frac, exp = m.groups()
+            places = abs(int(exp)) + len(frac or '')
+            return f"{num:.{places}f}"
+        return str(num)
 
     def on_closing(self):
         self.disconnect_serial()
@@ -1,25 +1,69 @@
 import serial
 import serial.tools.list_ports
+import io
 import threading
+import queue
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, StringVar
 import math
+import re
+import array
 import time
-import csv
+import numpy as np
 import matplotlib
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
 
 matplotlib.use("TkAgg")
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
 
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+N_CHANNELS = 1024
+# A bare dose reading; banner/status lines such as "Temp:24.87" fail the match instead of raising in float()
+_DOSE_LINE = re.compile(rb'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+# A "count,energy" spectrum row; anything else must not count toward the N_CHANNELS rows of a block
+_SPECTRUM_ROW = re.compile(_DOSE_LINE.pattern + rb'\s*,\s*' + _DOSE_LINE.pattern)
+_SCI_NUMBER = re.compile(r'^\s*[+-]?(?=\.?\d)\d*(?:\.(\d*))?[eE]([+-]?\d+)\s*$')
+
+
+if HAS_NUMBA:
+    @numba.njit(cache=True, fastmath=True)
+    def _max_window_sum(counts, w):
+        """Largest sum of w consecutive channels, in a single pass with no temporaries."""
+        s = 0.0
+        for i in range(w):
+            s += counts[i]
+        best = s
+        for i in range(w, counts.size):
+            s += counts[i] - counts[i - w]
+            if s > best:
+                best = s
+        return best
+else:
+    def _max_window_sum(counts, w):
+        """Largest sum of w consecutive channels, via prefix sums."""
+        csum = np.concatenate(([0.0], np.cumsum(counts)))
+        return float((csum[w:] - csum[:-w]).max())
+
+
 class GammaInterface:
     def __init__(self, master):
         self.master = master
         master.title("AlphaHound Interface (Python)")
 
         self.status_var = tk.StringVar(value="Status: Not Connected")
+        # Last strings pushed to the Tk variables; identical values are not set again
+        self._last_status_str = self.status_var.get()
+        self._last_dose = None
+        self._last_avg = None
+        # Status text waiting for _flush_status; bursts of updates collapse into one Tk set
+        self._pending_status = None
+        self._status_scheduled = False
         self.dose_var = tk.StringVar(value="Dose Rate: N/A uRem")
         self.avg_var = tk.StringVar(value="Dose Average: N/A uRem")
         self.hover_var = tk.StringVar(value="")
@@ -27,24 +71,51 @@ class GammaInterface:
         self.serial_thread = None
         self.serial_stop = threading.Event()
         self.serial_conn = None
-        self.writer_lock = threading.Lock()
-
-        self.dose_history = []
-        self.spectrum = []
+        self._tx_queue = queue.SimpleQueue()  # outgoing commands, written by serial_worker
+
+        # Dose log as parallel float arrays (epoch time, dose) plus a running total for the average;
+        # timestamps are only formatted on export
+        self._dose_times = array.array('d')
+        self._dose_values = array.array('d')
+        self._dose_sum = 0.0
+        # Spectrum as parallel per-channel arrays (struct-of-arrays)
+        self.counts = np.empty(0)
+        self.energies = np.empty(0)
+        # Per-ROI (lo, hi) channel slices, valid for the calibration in _roi_energies
+        self._roi_slices = None
+        self._roi_energies = None
+        # Prefix sums of counts (leading 0) and the counts array they were built from
+        self._cum = None
+        self._cum_for = None
+        # Plot state for blitted spectrum updates
+        self._bg = None
+        self._roi_shown = False
+        self._roi_legend = None
+        self._drawn_len = 0
+        self._full_redraw = True
+        self._max_redraw_rate = 5.0  # Hz
+        self._last_draw = 0.0
+        self._redraw_id = None
+        # Parsed spectra from the serial thread, consumed on the Tk thread by _pump_draw
+        self._draw_q = queue.Queue(maxsize=2)
+        self._pump_id = None
+        self._last_hover_channel = -1
+        self._last_hover_t = 0.0
+        self._hover_channel = -1
+        self._hover_id = None
         self.collect_spectrum = False
         self.gamma_manual_get = False
 
         self.timed_acquire_active = False
         self.timed_acquire_abort = threading.Event()
-        self.timed_acquire_thread = None
         self.timed_value = 0
+        self.timed_remaining = 0
+        self._timed_tick_id = None
 
-        self.timed_spectrum_update_active = False
-        self.timed_spectrum_update_thread = None
         self.waiting_for_final_timed_spectrum = False
 
         self.gamma_auto_running = False
-        self.gamma_auto_thread = None
+        self._auto_gamma_id = None
 
         self.rois = [
             {
@@ -131,7 +202,12 @@ class GammaInterface:
         self.fig = Figure(figsize=(7, 5), dpi=90)
         self.ax = self.fig.add_subplot(111)
         self.ax.set_xlabel("Channel"); self.ax.set_ylabel("Count"); self.ax.set_title("Gamma Spectrum")
+        # One StepPatch for the whole spectrum instead of a Rectangle per channel
+        self._spec_artist = self.ax.stairs([], [-0.5], fill=True, color='black', alpha=0.6, animated=True)
+        # ROI highlight is created once and toggled, not rebuilt per selection
+        self._roi_patch = self.ax.stairs([], [-0.5], fill=True, color='orange', alpha=0.5, visible=False)
         self.canvas = FigureCanvasTkAgg(self.fig, master=frame_plot)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
         self.canvas.get_tk_widget().pack(fill='x', expand=True)
         self.toolbar = NavigationToolbar2Tk(self.canvas, frame_plot)
         self.toolbar.update()
@@ -143,6 +219,7 @@ class GammaInterface:
         tk.Label(frame_hover, textvariable=self.hover_var, fg='darkgreen').pack(anchor='w')
 
         self.canvas.mpl_connect("motion_notify_event", self._on_mouse_move)
+        self._pump_id = self.master.after(33, self._pump_draw)
 
         # -------- New ROI Panel --------
         frame_roi = tk.LabelFrame(self.master, text="Region-of-Interest (ROI) Analysis", padx=8, pady=4)
@@ -171,17 +248,36 @@ class GammaInterface:
         self.roi_result_label.grid(row=1, column=0, columnspan=5, sticky='w', pady=(6,2))
 
     def _on_mouse_move(self, event):
-        if event.inaxes == self.ax and self.spectrum:
+        channel = -1
+        if event.inaxes == self.ax and len(self.counts):
             # Find the nearest integer channel
             channel = int(round(event.xdata))
-            if 0 <= channel < len(self.spectrum):
-                count, energy = self.spectrum[channel]
-                txt = f"Channel: {channel}   Count: {int(count)}   Energy: {energy:.1f} keV"
-            else:
-                txt = ""
+            if not 0 <= channel < len(self.counts):
+                channel = -1
+        self._hover_channel = channel
+        if self._hover_id is not None:
+            return  # the scheduled update will show this channel
+        wait = self._last_hover_t + 0.033 - time.monotonic()
+        if channel >= 0 and channel != self._last_hover_channel and wait > 0:
+            # ~30 Hz cap while moving across channels; the trailing update shows where the cursor stopped
+            self._hover_id = self.master.after(int(wait * 1000) + 1, self._show_hover)
+            return
+        self._show_hover()
+
+    def _show_hover(self):
+        self._hover_id = None
+        channel = self._hover_channel
+        if channel >= len(self.counts):
+            channel = -1  # spectrum replaced since the event
+        if channel == self._last_hover_channel:
+            return
+        self._last_hover_channel = channel
+        self._last_hover_t = time.monotonic()
+        if channel >= 0:
+            count, energy = self.counts[channel], self.energies[channel]
+            self.hover_var.set(f"Channel: {channel}   Count: {int(count)}   Energy: {energy:.1f} keV")
         else:
-            txt = ""
-        self.hover_var.set(txt)
+            self.hover_var.set("")
 
     def _populate_com_ports(self):
         ports = [port.device for port in serial.tools.list_ports.comports()]
@@ -198,25 +294,33 @@ class GammaInterface:
             return
         try:
             self.serial_conn = serial.Serial(port, 9600, timeout=0.2)
-            self.status_var.set("Status: Connected to " + port)
+            self._set_status("Status: Connected to " + port)
             self.button_connect.config(state='disabled')
             self.button_disconnect.config(state='normal')
             self.serial_stop.clear()
+            self._tx_queue = queue.SimpleQueue()
             self.serial_thread = threading.Thread(target=self.serial_worker, daemon=True)
             self.serial_thread.start()
         except Exception as e:
-            self.status_var.set(f"Status: Connection Failed ({e})")
+            self._set_status(f"Status: Connection Failed ({e})")
             self.serial_conn = None
 
     def disconnect_serial(self):
         self.abort_timed_count()
         self.stop_auto_gamma(force=True)
         self.serial_stop.set()
+        # Let the worker leave its blocking read and flush queued writes before the port is closed under it
+        if self.serial_conn:
+            try: self.serial_conn.cancel_read()
+            except: pass
+        if self.serial_thread and self.serial_thread is not threading.current_thread():
+            self.serial_thread.join(timeout=1.0)
+        self.serial_thread = None
         if self.serial_conn:
             try: self.serial_conn.close()
             except: pass
         self.serial_conn = None
-        self.status_var.set("Status: Disconnected")
+        self._set_status("Status: Disconnected")
         self.button_connect.config(state='normal')
         self.button_disconnect.config(state='disabled')
 
@@ -239,96 +343,194 @@ class GammaInterface:
         self.entry_time.config(state='normal')
 
     def serial_worker(self):
-        buffer = b''
-        spectrum_tmp = []
-        expecting_spectrum = False
+        buffer = bytearray()
+        self._rx_block = bytearray()
+        self._rx_rows = 0
+        self._expecting_spectrum = False
+        # (expecting_spectrum, has_comma) -> line handler; other combinations are ignored
+        handlers = {(True, True): self._on_spectrum_line, (False, False): self._on_dose_line}
+        # Own reference: disconnect_serial clears self.serial_conn only after this thread has exited
+        conn = self.serial_conn
         try:
             last_dose_time = 0
             while not self.serial_stop.is_set():
-                if self.serial_conn.in_waiting:
-                    data = self.serial_conn.read(self.serial_conn.in_waiting)
+                # Blocks up to the port timeout for the first byte, then takes the whole burst
+                data = conn.read(max(conn.in_waiting, 1))
+                if data:
                     buffer += data
-                    while b'\n' in buffer:
-                        line, buffer = buffer.split(b'\n', 1)
-                        line = line.decode(errors='ignore').strip()
-                        if line == "Comp":
-                            spectrum_tmp = []
-                            expecting_spectrum = True
-                            self.status_var.set("Status: Spectrum collecting...")
-                        elif expecting_spectrum and ',' in line:
-                            try:
-                                count, energy = line.split(',', 1)
-                                count = float(count)
-                                energy = float(energy)
-                                spectrum_tmp.append((count, energy))
-                            except ValueError:
-                                continue
-                            if len(spectrum_tmp) >= 1024:
-                                self.spectrum = spectrum_tmp.copy()
-                                self._draw_spectrum()
-                                if self.timed_acquire_active:
-                                    if getattr(self, "waiting_for_final_timed_spectrum", False):
-                                        self.waiting_for_final_timed_spectrum = False
-                                        self.master.after(0, self.timed_count_completed)
-                                    # else: this was just a live auto-update during timed count; do nothing extra
-                                elif self.gamma_auto_running:
-                                    pass
-                                elif self.gamma_manual_get:
-                                    self.master.after(0, self.manual_gamma_completed)
-                                # else: show exported/collected spectrum
-                                expecting_spectrum = False
-                        elif expecting_spectrum and not line:
-                            continue
-                        elif not expecting_spectrum and ',' not in line:
-                            try:
-                                dose = float(line)
-                                self._handle_dose(dose)
-                            except ValueError:
+                    # Split off every complete line at once; the partial tail stays buffered
+                    cut = buffer.rfind(b'\n')
+                    if cut >= 0:
+                        complete = bytes(buffer[:cut])
+                        del buffer[:cut + 1]
+                        for line in complete.split(b'\n'):
+                            line = line.strip()
+                            if line == b"Comp":
+                                self._rx_block = bytearray()
+                                self._rx_rows = 0
+                                self._expecting_spectrum = True
+                                self._ui(self._set_status, "Status: Spectrum collecting...")
                                 continue
+                            handler = handlers.get((self._expecting_spectrum, b',' in line))
+                            if handler:
+                                handler(line)
                 curr = time.time()
-                if self.serial_conn and curr - last_dose_time >= 1.0:
-                    self._serial_write(b"D"); last_dose_time = curr
-                time.sleep(0.05)
+                if curr - last_dose_time >= 1.0:
+                    self._tx_queue.put(b"D"); last_dose_time = curr
+                self._drain_tx(conn)
+            # Commands queued during shutdown (e.g. the final G from abort_timed_count) still go out
+            self._drain_tx(conn)
         except Exception as e:
-            self.status_var.set(f"Status: Serial error: {str(e)}")
-            self.disconnect_serial()
+            if not self.serial_stop.is_set():
+                self._ui(self._set_status, f"Status: Serial error: {str(e)}")
+                self._ui(self.disconnect_serial)
+
+    def _drain_tx(self, conn):
+        # Single writer: drain queued commands in FIFO order
+        while True:
+            try:
+                chunk = self._tx_queue.get_nowait()
+            except queue.Empty:
+                return
+            conn.write(chunk)
+
+    def _on_dose_line(self, line):
+        if _DOSE_LINE.fullmatch(line):
+            self._ui(self._handle_dose, float(line))
+
+    def _on_spectrum_line(self, line):
+        # Rows are only buffered here; the block is parsed in one call once every channel has arrived
+        if not _SPECTRUM_ROW.fullmatch(line):
+            return  # malformed row: skip it, as the old per-line parser did
+        self._rx_block += line
+        self._rx_block += b'\n'
+        self._rx_rows += 1
+        if self._rx_rows < N_CHANNELS:
+            return
+        spectrum = self._parse_spectrum_block(self._rx_block)
+        self._rx_block = bytearray()
+        self._rx_rows = 0
+        self._expecting_spectrum = False
+        try:
+            self._draw_q.put_nowait(spectrum)
+        except queue.Full:
+            # GUI is behind: drop the oldest pending spectrum, the newest one wins
+            try:
+                self._draw_q.get_nowait()
+            except queue.Empty:
+                pass
+            self._draw_q.put_nowait(spectrum)
+
+    def _pump_draw(self):
+        """Show the newest spectrum queued by the serial thread (runs on the Tk thread every 33 ms)."""
+        spectrum = None
+        while True:
+            try:
+                spectrum = self._draw_q.get_nowait()
+            except queue.Empty:
+                break
+        if spectrum is not None:
+            self._on_new_spectrum(*spectrum)
+        self._pump_id = self.master.after(33, self._pump_draw)
+
+    def _on_new_spectrum(self, counts, energies):
+        self.energies = energies
+        self.counts = counts
+        self._update_roi_slices()
+        self._cumulative_counts()
+        self._draw_spectrum()
+        if self.timed_acquire_active:
+            if getattr(self, "waiting_for_final_timed_spectrum", False):
+                self.waiting_for_final_timed_spectrum = False
+                self.timed_count_completed()
+            # else: this was just a live auto-update during timed count; do nothing extra
+        elif self.gamma_auto_running:
+            pass
+        elif self.gamma_manual_get:
+            self.manual_gamma_completed()
+        # else: show exported/collected spectrum
+
+    def _ui(self, fn, *args):
+        """Run fn(*args) on the Tk main thread; Tk widgets must not be touched from worker threads."""
+        try:
+            self.master.after(0, fn, *args)
+        except (tk.TclError, RuntimeError):
+            pass  # window already destroyed
+
+    def _parse_spectrum_block(self, block):
+        """Parse buffered "count,energy" rows into contiguous (counts, energies) arrays."""
+        arr = np.genfromtxt(io.BytesIO(bytes(block)), delimiter=',', usecols=(0, 1), dtype=np.float64)
+        # Every row was validated by _on_spectrum_line, so there are no NaN rows to drop
+        arr = arr.reshape(-1, 2)
+        counts, energies = np.ascontiguousarray(arr.T)
+        return counts, energies
 
     def _serial_write(self, data):
         if not self.serial_conn:
             return
-        try:
-            with self.writer_lock:
-                self.serial_conn.write(data)
-        except Exception as e:
-            self.status_var.set("Status: Serial error: " + str(e))
-            self.disconnect_serial()
+        self._tx_queue.put(data)
+
+    def _set_status(self, text):
+        self._pending_status = text
+        if not self._status_scheduled:
+            self._status_scheduled = True
+            self.master.after(100, self._flush_status)
+
+    def _flush_status(self):
+        self._status_scheduled = False
+        text = self._pending_status
+        if text != self._last_status_str:
+            self._last_status_str = text
+            self.status_var.set(text)
 
     def _handle_dose(self, dose):
-        self.dose_var.set(f"Dose Rate: {dose} uRem")
-        entry = {'time': time.strftime("%Y-%m-%d %H:%M:%S"), 'dose': dose}
-        self.dose_history.append(entry)
-        avg = sum([e['dose'] for e in self.dose_history]) / len(self.dose_history)
-        self.avg_var.set(f"Dose Average: {avg:.2f} uRem")
+        # Compare the numbers, so unchanged readings skip formatting as well as the Tk update
+        if dose != self._last_dose:
+            self._last_dose = dose
+            self.dose_var.set(f"Dose Rate: {dose} uRem")
+        self._dose_times.append(time.time())
+        self._dose_values.append(dose)
+        self._dose_sum += dose
+        avg = self._dose_sum / len(self._dose_values)
+        avg = round(avg, 2)
+        if avg != self._last_avg:
+            self._last_avg = avg
+            self.avg_var.set(f"Dose Average: {avg:.2f} uRem")
 
     def clear_dose_history(self):
-        self.dose_history = []
+        self._dose_times = array.array('d')
+        self._dose_values = array.array('d')
+        self._dose_sum = 0.0
         self.avg_var.set("Dose Average: N/A uRem")
         self.dose_var.set("Dose Rate: N/A uRem")
+        self._last_dose = self._last_avg = None
         messagebox.showinfo("Dose Rate Data", "Dose rate data cleared.")
 
+    def _format_dose_times(self, times):
+        """Format epoch seconds as local "YYYY-MM-DD HH:MM:SS" strings in one vectorized pass."""
+        times = times.astype(np.int64)
+        utc_offset = time.localtime(int(times[0])).tm_gmtoff
+        if time.localtime(int(times[-1])).tm_gmtoff != utc_offset:
+            # Log spans a DST change; fall back to per-sample conversion
+            return np.array([time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)) for t in times.tolist()])
+        local = (times + utc_offset).astype('datetime64[s]')
+        return np.char.replace(np.datetime_as_string(local, unit='s'), 'T', ' ')
+
     def export_dose_csv(self):
-        if not self.dose_history:
+        if not self._dose_values:
             messagebox.showinfo("Dose Rate Data", "No dose data to export.")
             return
         filename = filedialog.asksaveasfilename(defaultextension='.csv',
                             filetypes=[("CSV Files", "*.csv")],
                             title="Save Dose Rate CSV")
         if not filename: return
-        with open(filename, 'w', newline='') as f:
-            w = csv.writer(f)
-            w.writerow(["Time", "Dose Rate"])
-            for row in self.dose_history:
-                w.writerow([row['time'], row['dose']])
+        # Copy rather than view: _handle_dose appends on this (Tk) thread later on,
+        # and an array.array cannot grow while a NumPy view of it is still alive
+        doses = np.array(self._dose_values, dtype=np.float64)
+        stamps = self._format_dose_times(np.array(self._dose_times, dtype=np.float64))
+        with open(filename, 'w', newline='', buffering=1 << 20) as f:
+            np.savetxt(f, np.column_stack((stamps, doses.astype(str))), fmt='%s',
+                       delimiter=',', header="Time,Dose Rate", comments='')
         messagebox.showinfo("Dose Rate Data", f"CSV saved: {filename}")
 
     # def export_dose_n42(self):
@@ -359,14 +561,15 @@ class GammaInterface:
         if self.timed_acquire_active:
             self.abort_timed_count(forced=True)
         self.gamma_manual_get = True
-        self.spectrum = []
+        self.counts = np.empty(0)
+        self.energies = np.empty(0)
         self._disable_during_operation(spectrum=True, auto=True, timed=True)
-        self.status_var.set("Status: Waiting for spectrum...")
+        self._set_status("Status: Waiting for spectrum...")
         self._serial_write(b'G')
 
     def manual_gamma_completed(self):
         self.gamma_manual_get = False
-        self.status_var.set("Status: Manual spectrum collected, saving CSV...")
+        self._set_status("Status: Manual spectrum collected, saving CSV...")
         self.export_gamma_csv()
         self.export_gamma_n42()
         self._enable_normal_ops()
@@ -377,9 +580,10 @@ class GammaInterface:
             messagebox.showinfo("Not Connected", "Connect to the device first.")
             return
         self._serial_write(b'W')
-        self.spectrum = []
+        self.counts = np.empty(0)
+        self.energies = np.empty(0)
         self._draw_blank_spectrum()
-        self.status_var.set("Status: Clear command sent (W)")
+        self._set_status("Status: Clear command sent (W)")
 
     #========== AUTO GAMMA MUTEX LOGIC ==========
     def toggle_auto_gamma(self):
@@ -393,33 +597,37 @@ class GammaInterface:
             if self.timed_acquire_active:
                 self.abort_timed_count(forced=True)
             if self.gamma_manual_get:
-                self.status_var.set("Status: Interrupted manual spectrum for auto gamma start.")
+                self._set_status("Status: Interrupted manual spectrum for auto gamma start.")
                 self.gamma_manual_get = False
             self.gamma_auto_running = True
             self.button_auto_gamma.config(text="Stop Auto Gamma View")
             self._disable_during_operation(spectrum=True, auto=False, timed=True)
             self.button_stop_time.config(state='disabled')
-            self.status_var.set("Status: Auto Gamma started.")
+            self._set_status("Status: Auto Gamma started.")
             self._start_auto_gamma()
 
     def stop_auto_gamma(self, force=False):
         self.gamma_auto_running = False
+        if self._auto_gamma_id is not None:
+            self.master.after_cancel(self._auto_gamma_id)
+            self._auto_gamma_id = None
         self.button_auto_gamma.config(text="Start Auto Gamma View")
         self._enable_normal_ops()
         if not self.timed_acquire_active:
             self.button_stop_time.config(state='disabled')
         if not force:
-            self.status_var.set("Status: Auto Gamma stopped.")
+            self._set_status("Status: Auto Gamma stopped.")
 
     def _start_auto_gamma(self):
-        def auto_loop():
-            while self.gamma_auto_running and self.serial_conn:
-                self._serial_write(b'G')
-                for _ in range(50):
-                    if not self.gamma_auto_running: break
-                    time.sleep(0.1)
-        self.gamma_auto_thread = threading.Thread(target=auto_loop, daemon=True)
-        self.gamma_auto_thread.start()
+        self._auto_gamma_id = self.master.after(0, self._auto_gamma_tick)
+
+    def _auto_gamma_tick(self):
+        # Request a spectrum every 5 s from the Tk event loop; cancelled by stop_auto_gamma
+        if not (self.gamma_auto_running and self.serial_conn):
+            self._auto_gamma_id = None
+            return
+        self._serial_write(b'G')
+        self._auto_gamma_id = self.master.after(5000, self._auto_gamma_tick)
     #========== TIMED COUNT MUTEX LOGIC ==========
 
     def start_timed_count(self):
@@ -441,72 +649,61 @@ class GammaInterface:
         self.timed_acquire_active = True
         self.timed_acquire_abort.clear()
         self.waiting_for_final_timed_spectrum = False
-        self.timed_spectrum_update_active = True
+        self.timed_remaining = int(minutes * 60)
         self._disable_during_operation(spectrum=True, auto=True, timed=True)
         self.button_stop_time.config(state='normal')
         self.label_timer.config(text=f"Time remaining: {int(minutes):02d}:00")
-        self.status_var.set(f"Status: Timed count running for {minutes} min...")
-
-        self.timed_acquire_thread = threading.Thread(target=self.timed_count_thread, args=(minutes,), daemon=True)
-        self.timed_spectrum_update_thread = threading.Thread(target=self.timed_spectrum_live_update_loop, daemon=True)
-        self.timed_acquire_thread.start()
-        self.timed_spectrum_update_thread.start()
+        self._set_status(f"Status: Timed count running for {minutes} min...")
 
-    def timed_count_thread(self, minutes):
-        total_secs = int(minutes * 60)
         self.clear_spectrum()
-        for t in range(total_secs, 0, -1):
-            if self.timed_acquire_abort.is_set():
-                self.master.after(0, self.label_timer.config, {"text": " "})
-                self.master.after(0, self.status_var.set, "Status: Abort: acquiring spectrum...")
-                self.waiting_for_final_timed_spectrum = True
-                self._serial_write(b'G')
-                return
-            self.master.after(0, self.label_timer.config, {"text": f"Time remaining: {t // 60:02d}:{t % 60:02d}"})
-            time.sleep(1)
-        self.master.after(0, self.label_timer.config, {"text": " "})
-        if not self.timed_acquire_abort.is_set():
-            self.master.after(0, self.status_var.set, "Status: Timed count finished, acquiring spectrum...")
-            self.waiting_for_final_timed_spectrum = True
+        self._timed_tick()
+
+    def _timed_tick(self):
+        # One Tk timer per second drives both the countdown and the live spectrum refresh
+        self._timed_tick_id = None
+        if not self.timed_acquire_active or self.waiting_for_final_timed_spectrum:
+            return
+        t = self.timed_remaining
+        if t <= 0:
+            self.label_timer.config(text=" ")
+            self._request_final_timed_spectrum("Status: Timed count finished, acquiring spectrum...")
+            return
+        self.label_timer.config(text=f"Time remaining: {t // 60:02d}:{t % 60:02d}")
+        if not self.gamma_manual_get:
             self._serial_write(b'G')
+        self.timed_remaining = t - 1
+        self._timed_tick_id = self.master.after(1000, self._timed_tick)
+
+    def _request_final_timed_spectrum(self, status):
+        self._set_status(status)
+        self.waiting_for_final_timed_spectrum = True
+        self._serial_write(b'G')
 
     def abort_timed_count(self, forced=False):
-        self.timed_spectrum_update_active = False
-        if self.timed_acquire_active:
+        if self._timed_tick_id is not None:
+            self.master.after_cancel(self._timed_tick_id)
+            self._timed_tick_id = None
+        if self.timed_acquire_active and not self.waiting_for_final_timed_spectrum:
             self.timed_acquire_abort.set()
+            self.label_timer.config(text=" ")
             if not forced:
-                self.label_timer.config(text=" ")
-                self.status_var.set("Status: Stopping timed count, please wait for gamma spectrum...")
                 self.button_stop_time.config(state='disabled')
+            self._request_final_timed_spectrum("Status: Abort: acquiring spectrum...")
 
     def timed_count_completed(self):
         self.timed_acquire_active = False
-        self.timed_spectrum_update_active = False
         self.timed_acquire_abort.clear()
         self.label_timer.config(text=" ")
         self.button_stop_time.config(state='disabled')
-        self.status_var.set("Status: Timed spectrum collected, saving CSV...")
+        self._set_status("Status: Timed spectrum collected, saving CSV...")
         self.export_gamma_csv()
         self.export_gamma_n42()
         self._enable_normal_ops()
 
-    def timed_spectrum_live_update_loop(self):
-        while self.timed_spectrum_update_active and self.serial_conn and self.timed_acquire_active:
-            try:
-                # Only send an auto-update if not waiting for the final at end
-                if not self.gamma_manual_get and not self.waiting_for_final_timed_spectrum:
-                    self._serial_write(b"G")
-            except Exception:
-                pass
-            for _ in range(10):
-                if not self.timed_spectrum_update_active or not self.timed_acquire_active:
-                    break
-                time.sleep(0.1)
-
     #========== END MUTEX LOGIC ==========
 
     def export_gamma_csv(self):
-        if not self.spectrum:
+        if not len(self.counts):
             messagebox.showinfo("No Data", "No gamma spectrum data available.")
             return
         include_energy = self.checkvar_energy_csv.get() == 1
@@ -514,21 +711,16 @@ class GammaInterface:
                             filetypes=[("CSV Files", "*.csv")],
                             title="Save Gamma Spectrum CSV")
         if not filename: return
-        with open(filename, 'w', newline='') as f:
-            w = csv.writer(f)
+        with open(filename, 'w', newline='', buffering=1 << 20) as f:
             if include_energy:
-                w.writerow(["Data", "Energy"])
+                np.savetxt(f, np.column_stack((self.counts, self.energies)), fmt='%.10g',
+                           delimiter=',', header="Data,Energy", comments='')
             else:
-                w.writerow(["Data"])
-            for count, energy in self.spectrum:
-                if include_energy:
-                    w.writerow([count, energy])
-                else:
-                    w.writerow([count])
+                np.savetxt(f, self.counts[:, None], fmt='%.10g', delimiter=',', header="Data", comments='')
         messagebox.showinfo("Export", f"CSV saved: {filename}")
 
     def export_gamma_n42(self):
-        if not self.spectrum:
+        if not len(self.counts):
             messagebox.showinfo("No Data", "No gamma spectrum data available.")
             return
 
@@ -537,9 +729,7 @@ class GammaInterface:
                                                 title="Save Gamma Spectrum N42")
         if not filename: return
 
-        spectrum_counts = [int(count) for count, energy in self.spectrum]
-        energies = [float(energy) for count, energy in self.spectrum]
-        n_channels = len(spectrum_counts)
+        n_channels = len(self.counts)
 
         ns = "http://physics.nist.gov/N42/2006/N42"
         ET.register_namespace('', ns)
@@ -564,11 +754,11 @@ class GammaInterface:
         cal_fit = ET.SubElement(energy_cal, "CalibrationEquation")
         cal_fit.text = "List"
         channel_energies = ET.SubElement(energy_cal, "ChannelEnergies")
-        channel_energies.text = " ".join(f"{e:.5f}" for e in energies)
+        channel_energies.text = " ".join(np.char.mod("%.5f", self.energies))
 
         # ChannelData
         channeldata = ET.SubElement(spectrum, "ChannelData", NumberOfChannels=str(n_channels))
-        channeldata.text = " ".join(str(int(c)) for c in spectrum_counts)
+        channeldata.text = " ".join(np.char.mod("%d", self.counts.astype(np.int64)))
 
         # Optional meta
         spectrum_time = ET.SubElement(spectrum, "LiveTime")
@@ -576,17 +766,36 @@ class GammaInterface:
         sptype = ET.SubElement(spectrum, "SpectrumType")
         sptype.text = "PHA"
 
-        xmlstr = minidom.parseString(ET.tostring(root)).toprettyxml(indent="  ")
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(xmlstr)
+        ET.indent(root, space="  ")
+        ET.ElementTree(root).write(filename, encoding="utf-8", xml_declaration=True)
         messagebox.showinfo("Export", f"N42 XML saved: {filename}")
 
+    def _update_roi_slices(self):
+        """Recompute the ROI channel slices only when the energy calibration changes."""
+        energies = self.energies
+        if self._roi_slices is not None and np.array_equal(energies, self._roi_energies):
+            return
+        # Channel energies are monotonic, so each ROI is one contiguous slice
+        self._roi_slices = [
+            (int(np.searchsorted(energies, r['energy_min'], side='left')),
+             int(np.searchsorted(energies, r['energy_max'], side='right')))
+            for r in self.rois
+        ]
+        self._roi_energies = energies.copy()
+
+    def _cumulative_counts(self):
+        """Prefix sums of the current counts, so any ROI sum is cum[stop] - cum[start]."""
+        if self._cum_for is not self.counts:
+            self._cum = np.concatenate(([0.0], np.cumsum(self.counts)))
+            self._cum_for = self.counts
+        return self._cum
+
     def analyze_selected_roi(self):
-        if not self.spectrum or len(self.spectrum) == 0:
+        if not len(self.counts):
             self.roi_result_var.set("No spectrum loaded.")
             return
         sel_label = self.selected_roi.get()
-        for roi in self.rois:
+        for roi_idx, roi in enumerate(self.rois):
             if roi["label"] == sel_label:
                 break
         else:
@@ -596,13 +805,15 @@ class GammaInterface:
         roi_min, roi_max = roi['energy_min'], roi['energy_max']
         eff, br = roi['efficiency'], roi['gamma_abundance']
         label = roi["label"]
-        energies = [energy for count, energy in self.spectrum]
-        counts = [count for count, energy in self.spectrum]
-        roi_indices = [i for i, e in enumerate(energies) if roi_min <= e <= roi_max]
-        if not roi_indices:
+        counts = self.counts
+        self._update_roi_slices()
+        lo, hi = self._roi_slices[roi_idx]
+        window_size = hi - lo
+        if window_size <= 0:
             self.roi_result_var.set(f"{label}: No spectrum channels in ROI ({roi_min}-{roi_max} keV)")
             return
-        net_counts = sum([counts[i] for i in roi_indices])
+        cum = self._cumulative_counts()
+        net_counts = float(cum[hi] - cum[lo])
 
         # Compute activity (business as usual)
         try:
@@ -625,14 +836,8 @@ class GammaInterface:
         # --------- 186 keV logic with ratio metric ----------
         if "U-235" in label or "186" in label:
             # Find the max single ROI-width sum anywhere in spectrum
-            # (Use a moving sum of window of same size as 186 keV ROI)
-            window_size = len(roi_indices)
-            # Roll a window the size of the 186keV ROI across all channels
-            max_peak_counts = 0
-            for start in range(0, len(counts) - window_size + 1):
-                peak_sum = sum(counts[start:start + window_size])
-                if peak_sum > max_peak_counts:
-                    max_peak_counts = peak_sum
+            # (Moving sum of a window the size of the 186 keV ROI)
+            max_peak_counts = max(float(_max_window_sum(counts, window_size)), 0)
 
             if max_peak_counts == 0:
                 significance = 0
@@ -657,57 +862,96 @@ class GammaInterface:
             )
 
     def show_selected_roi(self):
-        if not self.spectrum or len(self.spectrum) == 0:
-            self.status_var.set("No spectrum loaded to show ROI.")
+        if not len(self.counts):
+            self._set_status("No spectrum loaded to show ROI.")
             return
         sel_label = self.selected_roi.get()
-        for roi in self.rois:
+        for roi_idx, roi in enumerate(self.rois):
             if roi["label"] == sel_label:
                 break
         else:
-            self.status_var.set("Invalid ROI selection.")
+            self._set_status("Invalid ROI selection.")
             return
-        energies = [energy for count, energy in self.spectrum]
-        counts = [count for count, energy in self.spectrum]
-        roi_min, roi_max = roi['energy_min'], roi['energy_max']
-        roi_indices = [i for i, e in enumerate(energies) if roi_min <= e <= roi_max]
-        self._draw_spectrum(redraw=False)  # To clear old highlights, keep spectrum
-        if roi_indices:
-            start = roi_indices[0]
-            end = roi_indices[-1]
-            self.ax.bar(
-                range(start, end+1),
-                [counts[i] for i in range(start, end+1)],
-                color='orange', alpha=0.5, width=1.0, label=f'ROI: {sel_label}'
-            )
-            self.ax.legend()
+        self._update_roi_slices()
+        start, stop = self._roi_slices[roi_idx]
+        self._remove_roi_highlight()
+        if stop > start:
+            label = f'ROI: {sel_label}'
+            self._roi_patch.set_data(self.counts[start:stop], np.arange(start, stop+1) - 0.5)
+            self._roi_patch.set_label(label)
+            self._roi_patch.set_visible(True)
+            if self._roi_legend is None:
+                self._roi_legend = self.ax.legend(handles=[self._roi_patch])
+            else:
+                self._roi_legend.get_texts()[0].set_text(label)
+                self._roi_legend.set_visible(True)
+            self._roi_shown = True
             self.canvas.draw()
-            self.status_var.set(f"{sel_label} ROI highlighted on plot.")
+            self._set_status(f"{sel_label} ROI highlighted on plot.")
         else:
-            self.status_var.set(f"No spectrum channels in {sel_label} ROI.")
+            self.canvas.draw()
+            self._set_status(f"No spectrum channels in {sel_label} ROI.")
 
     def clear_roi_highlight(self):
         self._draw_spectrum(redraw=True)
-        self.status_var.set("ROI highlight cleared from plot.")
+        self._set_status("ROI highlight cleared from plot.")
+
+    def _remove_roi_highlight(self):
+        if self._roi_shown:
+            self._roi_patch.set_visible(False)
+            self._roi_legend.set_visible(False)
+            self._roi_shown = False
+            self._full_redraw = True
+
+    def _on_draw(self, event):
+        # Every full draw (resize, zoom/pan, overlays) refreshes the blit background
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self._spec_artist)
 
     def _draw_spectrum(self, redraw=True):
-        """Redraw spectrum, wiping any ROI highlight. If redraw is False, keeps the last plot as-is (for overlays)."""
+        """Update the spectrum trace, wiping any ROI highlight if redraw is True. Rate limited to _max_redraw_rate."""
         if redraw:
-            self.ax.cla()
-            self.ax.set_xlabel("Channel")
-            self.ax.set_ylabel("Count")
-            self.ax.set_title("Gamma Spectrum")
-        if self.spectrum:
-            channels = list(range(len(self.spectrum)))
-            counts = [count for count, energy in self.spectrum]
-            self.ax.bar(channels, counts, color='black', alpha=0.6, width=1.0)
-        self.canvas.draw()
+            self._remove_roi_highlight()
+        if self._redraw_id is not None:
+            return
+        wait = self._last_draw + 1.0 / self._max_redraw_rate - time.monotonic()
+        if wait > 0:
+            self._redraw_id = self.master.after(int(wait * 1000) + 1, self._deferred_draw)
+            return
+        self._render_spectrum()
+
+    def _deferred_draw(self):
+        self._redraw_id = None
+        self._render_spectrum()
+
+    def _render_spectrum(self):
+        self._last_draw = time.monotonic()
+        counts = self.counts
+        n = len(counts)
+        self._spec_artist.set_data(counts, np.arange(n + 1) - 0.5)
+        peak = float(counts.max()) if n else 0.0
+        top = self.ax.get_ylim()[1]
+        if self._full_redraw or self._bg is None or n != self._drawn_len or not (top / 2 - 1 <= peak <= top):
+            # Axis limits must change: full redraw, which also recaptures the background
+            self._full_redraw = False
+            self._drawn_len = n
+            if n:
+                self.ax.relim()
+                self.ax.set_autoscale_on(True)
+                self.ax.autoscale_view()
+                self.ax.set_ylim(bottom=0)
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._bg)
+            self.ax.draw_artist(self._spec_artist)
+            self.canvas.blit(self.ax.bbox)
 
     def _draw_blank_spectrum(self):
-        self.ax.cla()
-        self.ax.set_xlabel("Channel")
-        self.ax.set_ylabel("Count")
-        self.ax.set_title("Gamma Spectrum")
+        self._remove_roi_highlight()
+        self._spec_artist.set_data([], [-0.5])
+        self.ax.set_xlim(0, 1)
+        self.ax.set_ylim(0, 1)
+        self._drawn_len = 0
         self.canvas.draw()
 
     def send_custom_command(self):
@@ -726,18 +970,24 @@ class GammaInterface:
         self.entry_command.delete(0, tk.END)
 
     def _normalize_number(self, token):
+        m = _SCI_NUMBER.match(token)
         try:
             num = float(token)
-            if "e" in token.lower():
-                coef, exp = token.lower().split('e')
-                places = abs(int(exp)) + (len(coef.split(".")[1]) if '.' in coef else 0)
-                return f"{num:.{places}f}"
-            else:
-                return str(num)
-        except:
+        except ValueError:
             return token
+        if m:
+            frac, exp = m.groups()
+            places = abs(int(exp)) + len(frac or '')
+            return f"{num:.{places}f}"
+        return str(num)
 
     def on_closing(self):
+        if self._pump_id is not None:
+            self.master.after_cancel(self._pump_id)
+            self._pump_id = None
+        if self._hover_id is not None:
+            self.master.after_cancel(self._hover_id)
+            self._hover_id = None
         self.disconnect_serial()
         self.master.destroy()
 
@@ -4,6 +4,9 @@ import time
 import sys
 import re
 
+_CSV_RE = re.compile(r"\d+([.,]\d*)?,")
+_NUM_RE = re.compile(r"^\d+\.?\d*$")
+
 def pick_serial_port():
     ports = list(serial.tools.list_ports.comports())
     if not ports:
@@ -32,14 +35,19 @@ def try_command(ser, cmd, timeout=1.5, tag=""):
     ser.write(cmd)
     t0 = time.time()
     first_line = True
-    buffer = b""
+    buffer = bytearray()
     results = []
     while time.time() - t0 < timeout:
-        if ser.in_waiting:
-            data = ser.read(ser.in_waiting)
-            buffer += data
-            while b'\n' in buffer:
-                line, buffer = buffer.split(b'\n', 1)
+        # Block in read() for up to ser.timeout instead of polling with sleep
+        data = ser.read(max(1, ser.in_waiting))
+        if data:
+            buffer.extend(data)
+            nl = buffer.rfind(b'\n')
+            if nl == -1:
+                continue
+            lines = bytes(buffer[:nl]).split(b'\n')
+            del buffer[:nl + 1]
+            for line in lines:
                 try:
                     text = line.decode(errors="ignore").strip()
                 except:
@@ -49,19 +57,18 @@ def try_command(ser, cmd, timeout=1.5, tag=""):
                 # Print with keyword/color highlighting!
                 if "Comp" in text:
                     print("  [COMP]       " + text)
-                elif "," in text and re.match(r"\d+([.,]\d*)?,", text):
+                elif "," in text and _CSV_RE.match(text):
                     print("  [SPECTRUM?]  " + text)
-                elif re.match(r"^\d+\.?\d*$", text):
+                elif _NUM_RE.match(text):
                     print("  [NUMERIC]    " + text)
                 else:
                     print("  [REPLY]      " + text)
-        time.sleep(0.05)
     return results
 
 def main():
     port = pick_serial_port()
     baud = 9600
-    ser = serial.Serial(port, baud, timeout=0.3)
+    ser = serial.Serial(port, baud, timeout=0.1)
     print(f"\nOpened serial port {port} at {baud} baud.\n")
     logfile = f"alphahound_serial_probe_{int(time.time())}.txt"
 
@@ -89,35 +96,39 @@ def main():
     print("Type 'QUIT' to exit.")
 
     all_log = []
+    log_fp = open(logfile, "a", encoding="utf-8")
 
-    while True:
-        inp = input("> Command: ").strip()
-        if not inp: continue
-        if inp.upper() == "QUIT": break
-        if inp.upper() == "AUTO":
-            print("\n=== AUTO-PROBING ALL COMMON COMMANDS ===\n")
-            all_auto_res = []
-            for test in test_cmds:
-                responses = try_command(ser, test, timeout=2.5, tag="AUTO")
-                all_auto_res.append((test, responses))
-                print("-"*50)
-            print("\nDONE with AUTO. Saved output to logfile.")
-            with open(logfile, "a", encoding="utf-8") as f:
+    try:
+        while True:
+            inp = input("> Command: ").strip()
+            if not inp: continue
+            if inp.upper() == "QUIT": break
+            if inp.upper() == "AUTO":
+                print("\n=== AUTO-PROBING ALL COMMON COMMANDS ===\n")
+                all_auto_res = []
+                for test in test_cmds:
+                    responses = try_command(ser, test, timeout=2.5, tag="AUTO")
+                    all_auto_res.append((test, responses))
+                    print("-"*50)
+                print("\nDONE with AUTO. Saved output to logfile.")
                 tmark = time.strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f"\n-----[AUTO PROBE {tmark}]-----\n")
+                log_fp.write(f"\n-----[AUTO PROBE {tmark}]-----\n")
                 for cmd, responses in all_auto_res:
-                    f.write(f"\nCMD: {cmd}\n")
+                    log_fp.write(f"\nCMD: {cmd}\n")
                     for r in responses:
-                        f.write("   " + r + "\n")
-            continue
+                        log_fp.write("   " + r + "\n")
+                log_fp.flush()
+                continue
 
-        print(f"\n--- Sending '{inp}' ---")
-        responses = try_command(ser, inp, timeout=2.5)
-        tmark = time.strftime("%Y-%m-%d %H:%M:%S")
-        with open(logfile, "a", encoding="utf-8") as f:
-            f.write(f"\n[{tmark}] CMD: {inp}\n")
+            print(f"\n--- Sending '{inp}' ---")
+            responses = try_command(ser, inp, timeout=2.5)
+            tmark = time.strftime("%Y-%m-%d %H:%M:%S")
+            log_fp.write(f"\n[{tmark}] CMD: {inp}\n")
             for r in responses:
-                f.write("   " + r + "\n")
+                log_fp.write("   " + r + "\n")
+            log_fp.flush()
+    finally:
+        log_fp.close()
 
     ser.close()
     print("Closed serial port.")
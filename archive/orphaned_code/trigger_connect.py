@@ -1,9 +1,11 @@
 import requests
+session = requests.Session()
 try:
     # First get ports to be sure
-    r = requests.get('http://localhost:8081/device/ports')
-    print("Ports:", r.json())
-    ports = r.json().get('ports', [])
+    r = session.get('http://localhost:8081/device/ports', timeout=5)
+    data = r.json()
+    print("Ports:", data)
+    ports = data.get('ports', [])
     if not ports:
         print("No ports found")
         exit()
@@ -11,7 +13,7 @@ try:
     port = "COM8" # User specified
     print(f"Connecting to {port}...")
     
-    r = requests.post('http://localhost:8081/device/connect', json={'port': port})
+    r = session.post('http://localhost:8081/device/connect', json={'port': port}, timeout=30)
     print("Connect:", r.status_code, r.text)
 except Exception as e:
     print(e)
@@ -5,6 +5,7 @@ import os
 
 BASE_URL = "http://127.0.0.1:8080"
 TEST_FILE = "../test.n42"
+TIMEOUT = (3, 30)
 
 def verify():
     print("1. Testing Upload...")
@@ -12,10 +13,11 @@ def verify():
         print(f"Error: {TEST_FILE} not found")
         return
 
-    with open(TEST_FILE, 'rb') as f:
+    session = requests.Session()
+    with session, open(TEST_FILE, 'rb') as f:
         files = {'file': (os.path.basename(TEST_FILE), f)}
         try:
-            res = requests.post(f"{BASE_URL}/upload", files=files)
+            res = session.post(f"{BASE_URL}/upload", files=files, timeout=TIMEOUT)
             if res.status_code != 200:
                 print(f"Upload failed: {res.text}")
                 return
@@ -30,7 +32,7 @@ def verify():
                 "peaks": data["peaks"]
             }
             
-            res_fit = requests.post(f"{BASE_URL}/analyze/fit-peaks", json=payload)
+            res_fit = session.post(f"{BASE_URL}/analyze/fit-peaks", json=payload, timeout=TIMEOUT)
             if res_fit.status_code != 200:
                 print(f"Fitting failed: {res_fit.text}")
                 return
@@ -1,6 +1,9 @@
 import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image, ImageDraw
 import numpy as np
+from scipy.ndimage import label
 
 ICONS_DIR = r"c:\Users\stati\Desktop\Projects\AlphaHoundGUI\backend\static\icons"
 
@@ -22,10 +25,6 @@ def remove_background_floodfill(image_path):
         # We need a seed point. We'll assume at least one corner is background.
         # But floodfill on RGBA works best if we first identify the region.
         
-        # Alternative approach:
-        # Create a mask image initialized to 0
-        mask = Image.new('L', (width, height), 0)
-        
         # We will use the 'tolerance' parameter of floodfill if we implemented it manually, 
         # but PIL's floodfill fills a color.
         
@@ -34,49 +33,31 @@ def remove_background_floodfill(image_path):
         # 2. Compute difference from this color
         # 3. Use flood fill on the difference map to find the connected background region
         
-        data = np.array(img)
+        # Get corner colors (straight from PIL, before paying for the array copy)
+        corner_colors = [img.getpixel(c) for c in corners]
+        # Corners already transparent: nothing to remove
+        if all(c[3] == 0 for c in corner_colors):
+            print(f"Skipped {image_path} (background already transparent)")
+            return
         
-        # Get corner colors
-        corner_colors = [tuple(data[y, x]) for x, y in corners]
+        data = np.array(img)
         # Find most common corner color (simple count)
-        bg_color = max(set(corner_colors), key=corner_colors.count)
+        bg_color = Counter(corner_colors).most_common(1)[0][0]
         
-        # Calculate Euclidean distance from bg_color
-        diff = np.sqrt(np.sum((data - bg_color) ** 2, axis=2))
+        # Calculate squared Euclidean distance from bg_color
+        # (int16 differences avoid uint8 wraparound; squares are summed in int32 so 4*255^2 fits)
+        d = data.astype(np.int16) - np.asarray(bg_color, dtype=np.int16)
+        diff2 = np.einsum('ijk,ijk->ij', d, d, dtype=np.int32)
         
         # Threshold: pixels close to background color are candidates
-        # Tolerance of 25 (approx 10% for individual channels combined)
-        candidates = diff < 25
+        # Tolerance of 25 (approx 10% for individual channels combined), compared squared
+        candidates = diff2 < 25 * 25
         
         # Now we only want candidates connected to the edge (flood fill approach)
-        # We can implement a simple BFS/DFS on the boolean mask
-        
-        processed_mask = np.zeros(candidates.shape, dtype=bool)
-        queue = []
-        
-        # Add all border pixels that are candidates to the queue
-        for x in range(width):
-            if candidates[0, x]: queue.append((0, x))
-            if candidates[height-1, x]: queue.append((height-1, x))
-            
-        for y in range(height):
-            if candidates[y, 0]: queue.append((y, 0))
-            if candidates[y, width-1]: queue.append((y, width-1))
-            
-        # Standard BFS
-        while queue:
-            y, x = queue.pop(0)
-            if processed_mask[y, x]:
-                continue
-            
-            processed_mask[y, x] = True
-            
-            # Check neighbors
-            for dy, dx in [(-1,0), (1,0), (0,-1), (0,1)]:
-                ny, nx = y + dy, x + dx
-                if 0 <= ny < height and 0 <= nx < width:
-                    if candidates[ny, nx] and not processed_mask[ny, nx]:
-                        queue.append((ny, nx))
+        # Label 4-connected regions and keep those touching the border
+        lbl, _ = label(candidates)
+        border_labels = np.unique(np.concatenate([lbl[0], lbl[-1], lbl[:, 0], lbl[:, -1]]))
+        processed_mask = np.isin(lbl, border_labels) & (lbl != 0)
         
         # processed_mask now contains True for background pixels
         
@@ -94,6 +75,7 @@ if __name__ == "__main__":
     if not os.path.exists(ICONS_DIR):
         print(f"Directory not found: {ICONS_DIR}")
     else:
-        for filename in os.listdir(ICONS_DIR):
-            if filename.lower().endswith(".png"):
-                remove_background_floodfill(os.path.join(ICONS_DIR, filename))
+        files = [os.path.join(ICONS_DIR, f) for f in os.listdir(ICONS_DIR) if f.lower().endswith(".png")]
+        # Icons are independent, so spread them across cores
+        with ProcessPoolExecutor() as ex:
+            list(ex.map(remove_background_floodfill, files))
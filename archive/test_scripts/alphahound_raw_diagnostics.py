@@ -18,6 +18,16 @@ import sys
 import time
 from datetime import datetime
 import json
+import re
+import queue
+import threading
+from collections import Counter
+import numpy as np
+
+N_CHANNELS = 1024
+
+# Bare dose reading, e.g. "17.35" or "-0.5"
+_DOSE_RE = re.compile(r"^-?(?:\d+\.?\d*|\.\d+)$")
 
 class AlphaHoundDiagnostics:
     def __init__(self, port, baudrate=115200):
@@ -25,8 +35,12 @@ class AlphaHoundDiagnostics:
         self.baudrate = baudrate
         self.serial_conn = None
         self.capture_log = []
+        self._msg_type_counts = Counter()
+        self._has_dose = False
         self.session_start = None
-        self.spectrum_data = []
+        self.spectrum_counts = np.empty(N_CHANNELS, dtype=np.float64)
+        self.spectrum_energies = np.empty(N_CHANNELS, dtype=np.float64)
+        self.spectrum_len = 0
         
     def list_available_ports(self):
         """List all available COM ports"""
@@ -59,16 +73,31 @@ class AlphaHoundDiagnostics:
         return datetime.now().strftime("%H:%M:%S.%f")[:-3]
     
     def log_message(self, direction, data, parsed=None):
-        """Log a message with timestamp and metadata"""
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "elapsed_s": (datetime.now() - self.session_start).total_seconds(),
+        """Log a message with timestamp and metadata (serialized later in save_results)"""
+        self.capture_log.append({
+            "time": datetime.now(),
             "direction": direction,
-            "raw_bytes": data.hex() if isinstance(data, bytes) else None,
-            "decoded": data.decode('utf-8', errors='replace') if isinstance(data, bytes) else data,
+            "data": data,
             "parsed": parsed
+        })
+        if direction == "RX" and parsed:
+            key = next(iter(parsed))
+            self._msg_type_counts[key] += 1
+            if key == 'dose_uRem':
+                self._has_dose = True
+    
+    def _serialize_entry(self, entry):
+        """Expand a capture_log entry into its JSON form"""
+        data = entry["data"]
+        is_bytes = isinstance(data, bytes)
+        return {
+            "timestamp": entry["time"].isoformat(),
+            "elapsed_s": (entry["time"] - self.session_start).total_seconds(),
+            "direction": entry["direction"],
+            "raw_bytes": data.hex() if is_bytes else None,
+            "decoded": data.decode('utf-8', errors='replace') if is_bytes else data,
+            "parsed": entry["parsed"]
         }
-        self.capture_log.append(entry)
         
     def send_command(self, cmd):
         """Send a command to the device"""
@@ -78,6 +107,16 @@ class AlphaHoundDiagnostics:
         self.log_message("TX", cmd)
         print(f"[{self.timestamp()}] TX → {cmd.decode('utf-8', errors='replace')}")
     
+    def _store_channel(self, count, energy):
+        """Write one channel into the preallocated spectrum arrays, growing them if the device sends extra"""
+        i = self.spectrum_len
+        if i == len(self.spectrum_counts):
+            self.spectrum_counts = np.resize(self.spectrum_counts, 2 * i)
+            self.spectrum_energies = np.resize(self.spectrum_energies, 2 * i)
+        self.spectrum_counts[i] = count
+        self.spectrum_energies[i] = energy
+        self.spectrum_len = i + 1
+    
     def analyze_line(self, line):
         """Analyze and categorize a received line"""
         line_stripped = line.strip()
@@ -88,6 +127,7 @@ class AlphaHoundDiagnostics:
         
         if line_stripped == "Comp":
             msg_type = "SPECTRUM_START"
+            self.spectrum_len = 0
         elif ',' in line_stripped:
             try:
                 parts = line_stripped.split(',')
@@ -96,10 +136,10 @@ class AlphaHoundDiagnostics:
                     energy = float(parts[1])
                     msg_type = "SPECTRUM_DATA"
                     parsed_data = {"count": count, "energy_keV": energy}
-                    self.spectrum_data.append(parsed_data)
+                    self._store_channel(count, energy)
             except ValueError:
                 msg_type = "UNKNOWN_CSV"
-        elif line_stripped.replace('.', '', 1).replace('-', '', 1).isdigit():
+        elif _DOSE_RE.match(line_stripped):
             try:
                 dose = float(line_stripped)
                 msg_type = "DOSE_RATE"
@@ -120,61 +160,83 @@ class AlphaHoundDiagnostics:
         print("  G - Request spectrum (at 10s)")
         print("  W - Clear spectrum (at 15s)\n")
         
-        buffer = b''
+        buffer = bytearray()
+        rx_queue = queue.Queue()
+        running = threading.Event()
+        running.set()
+        
+        def reader():
+            # Blocking reads on their own thread so command pacing never delays RX
+            while running.is_set():
+                data = self.serial_conn.read(max(1, self.serial_conn.in_waiting))
+                if data:
+                    rx_queue.put(data)
+        
+        reader_thread = threading.Thread(target=reader, daemon=True)
         start_time = time.time()
-        last_dose_request = 0
-        spectrum_requested = False
-        spectrum_cleared = False
+        next_dose_request = 2.0
+        scheduled = [
+            (10.0, b'G', "Requesting spectrum..."),
+            (15.0, b'W', "Clearing spectrum..."),
+        ]
+        reader_thread.start()
         
         try:
-            while (time.time() - start_time) < duration_seconds:
+            while True:
                 elapsed = time.time() - start_time
+                if elapsed >= duration_seconds:
+                    break
                 
                 # Auto-send commands for testing
-                if elapsed - last_dose_request >= 2.0:
+                if elapsed >= next_dose_request:
                     self.send_command(b'D')
-                    last_dose_request = elapsed
+                    next_dose_request += 2.0
                 
-                if not spectrum_requested and elapsed >= 10.0:
-                    print(f"\n[{self.timestamp()}] >>> Requesting spectrum...\n")
-                    self.send_command(b'G')
-                    spectrum_requested = True
+                while scheduled and elapsed >= scheduled[0][0]:
+                    _, cmd, note = scheduled.pop(0)
+                    print(f"\n[{self.timestamp()}] >>> {note}\n")
+                    self.send_command(cmd)
                 
-                if not spectrum_cleared and elapsed >= 15.0:
-                    print(f"\n[{self.timestamp()}] >>> Clearing spectrum...\n")
-                    self.send_command(b'W')
-                    spectrum_cleared = True
+                # Wait for data, but no longer than until the next command is due
+                next_event = min(next_dose_request, duration_seconds)
+                if scheduled:
+                    next_event = min(next_event, scheduled[0][0])
+                try:
+                    data = rx_queue.get(timeout=max(0.0, next_event - elapsed))
+                except queue.Empty:
+                    continue
+                buffer.extend(data)
                 
-                # Read available data
-                if self.serial_conn.in_waiting:
-                    data = self.serial_conn.read(self.serial_conn.in_waiting)
-                    buffer += data
+                # Process complete lines
+                nl = buffer.rfind(b'\n')
+                if nl == -1:
+                    continue
+                lines = bytes(buffer[:nl]).split(b'\n')
+                del buffer[:nl + 1]
+                for line_bytes in lines:
+                    line = line_bytes.decode('utf-8', errors='replace')
                     
-                    # Process complete lines
-                    while b'\n' in buffer:
-                        line_bytes, buffer = buffer.split(b'\n', 1)
-                        line = line_bytes.decode('utf-8', errors='replace')
-                        
-                        msg_type, parsed = self.analyze_line(line)
-                        self.log_message("RX", line_bytes, parsed)
-                        
-                        # Print with color coding
-                        if msg_type == "SPECTRUM_START":
-                            print(f"[{self.timestamp()}] RX ← [{msg_type}] {line.strip()}")
-                        elif msg_type == "SPECTRUM_DATA":
-                            # Only print first few and summary
-                            if len(self.spectrum_data) <= 5 or len(self.spectrum_data) >= 1024:
-                                print(f"[{self.timestamp()}] RX ← [{msg_type}] Count={parsed['count']}, "
-                                      f"Energy={parsed['energy_keV']} keV ({len(self.spectrum_data)}/1024)")
-                        elif msg_type == "DOSE_RATE":
-                            print(f"[{self.timestamp()}] RX ← [{msg_type}] {parsed['dose_uRem']} µRem/h")
-                        else:
-                            print(f"[{self.timestamp()}] RX ← [{msg_type}] {line.strip()}")
-                
-                time.sleep(0.05)
+                    msg_type, parsed = self.analyze_line(line)
+                    self.log_message("RX", line_bytes, parsed)
+                    
+                    # Print with color coding
+                    if msg_type == "SPECTRUM_START":
+                        print(f"[{self.timestamp()}] RX ← [{msg_type}] {line.strip()}")
+                    elif msg_type == "SPECTRUM_DATA":
+                        # Only print first few and summary
+                        if self.spectrum_len <= 5 or self.spectrum_len >= N_CHANNELS:
+                            print(f"[{self.timestamp()}] RX ← [{msg_type}] Count={parsed['count']}, "
+                                  f"Energy={parsed['energy_keV']} keV ({self.spectrum_len}/{N_CHANNELS})")
+                    elif msg_type == "DOSE_RATE":
+                        print(f"[{self.timestamp()}] RX ← [{msg_type}] {parsed['dose_uRem']} µRem/h")
+                    else:
+                        print(f"[{self.timestamp()}] RX ← [{msg_type}] {line.strip()}")
                 
         except KeyboardInterrupt:
             print(f"\n[{self.timestamp()}] Capture interrupted by user")
+        finally:
+            running.clear()
+            reader_thread.join(timeout=2.0)
     
     def save_results(self, filename="alphahound_diagnostics.json"):
         """Save capture log to JSON file"""
@@ -185,10 +247,10 @@ class AlphaHoundDiagnostics:
                 "start_time": self.session_start.isoformat(),
                 "duration_s": (datetime.now() - self.session_start).total_seconds(),
                 "total_messages": len(self.capture_log),
-                "spectrum_channels_captured": len(self.spectrum_data)
+                "spectrum_channels_captured": self.spectrum_len
             },
             "analysis": self.analyze_capture(),
-            "raw_log": self.capture_log
+            "raw_log": [self._serialize_entry(e) for e in self.capture_log]
         }
         
         with open(filename, 'w', encoding='utf-8') as f:
@@ -199,18 +261,12 @@ class AlphaHoundDiagnostics:
     
     def analyze_capture(self):
         """Analyze the captured data for N42 export fields"""
-        msg_types = {}
-        for entry in self.capture_log:
-            if entry['direction'] == 'RX' and entry['parsed']:
-                msg_type = list(entry['parsed'].keys())[0] if entry['parsed'] else "unknown"
-                msg_types[msg_type] = msg_types.get(msg_type, 0) + 1
-        
         analysis = {
-            "message_types": msg_types,
+            "message_types": dict(self._msg_type_counts),
             "n42_fields_available": {
-                "counts_array": len(self.spectrum_data) > 0,
-                "energy_calibration": len(self.spectrum_data) > 0,
-                "dose_rate": any('dose_uRem' in e.get('parsed', {}) for e in self.capture_log),
+                "counts_array": self.spectrum_len > 0,
+                "energy_calibration": self.spectrum_len > 0,
+                "dose_rate": self._has_dose,
                 "timestamps": "Device does NOT provide timestamps",
                 "live_time": "NOT AVAILABLE - Device does not send",
                 "real_time": "NOT AVAILABLE - Device does not send",
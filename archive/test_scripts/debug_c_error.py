@@ -11,13 +11,13 @@ n_channels = 128
 labels = ['Cs137'] * 5 + ['Background'] * 5
 
 # Training spectra
-train_matrix = np.random.poisson(10, (n_samples, n_channels)).astype(float)
+train_matrix = np.random.poisson(10, (n_samples, n_channels)).astype(np.float32)
 for i in range(5):
     train_matrix[i, 60:70] += 250
 
 train_ss = SampleSet()
 # Use explicit integer column names
-train_ss.spectra = pd.DataFrame(train_matrix, columns=range(n_channels))
+train_ss.spectra = pd.DataFrame(train_matrix, columns=range(n_channels), copy=False)
 train_ss.spectra_type = 3
 train_ss.spectra_state = 1
 
@@ -25,11 +25,9 @@ print(f"Training columns (first 5): {list(train_ss.spectra.columns[:5])}")
 
 # Sources
 unique_labels = list(set(labels))
-sources_data = {}
-for iso in unique_labels:
-    sources_data[('Radionuclide', iso, '')] = [1.0 if l == iso else 0.0 for l in labels]
-sources_df = pd.DataFrame(sources_data)
-sources_df.columns = pd.MultiIndex.from_tuples(sources_df.columns, names=SampleSet.SOURCES_MULTI_INDEX_NAMES)
+onehot = (np.asarray(labels)[:, None] == np.asarray(unique_labels)[None, :]).astype(float)
+sources_df = pd.DataFrame(onehot, columns=pd.MultiIndex.from_tuples(
+    [('Radionuclide', iso, '') for iso in unique_labels], names=SampleSet.SOURCES_MULTI_INDEX_NAMES))
 train_ss.sources = sources_df
 
 print("Training...")
@@ -38,12 +36,12 @@ model.fit(train_ss, epochs=3, target_level='Isotope', verbose=False)
 print("✓ Training complete!")
 
 # Test spectrum
-test_spectrum = np.random.poisson(10, n_channels).astype(float)
+test_spectrum = np.random.poisson(10, n_channels).astype(np.float32)
 test_spectrum[60:70] += 250
 
 test_ss = SampleSet()
 # IMPORTANT: Use same column structure as training!
-test_ss.spectra = pd.DataFrame(test_spectrum.reshape(1, -1), columns=range(n_channels))
+test_ss.spectra = pd.DataFrame(test_spectrum.reshape(1, -1), columns=range(n_channels), copy=False)
 test_ss.spectra_type = 3
 test_ss.spectra_state = 1
 
@@ -11,7 +11,7 @@ n_channels = 128
 isotopes = ['Cs137', 'Co60', 'Background']
 
 # Create spectra as 2D matrix (rows=samples, cols=channels)
-spectra_matrix = np.random.poisson(10, (n_samples, n_channels)).astype(float)
+spectra_matrix = np.random.poisson(10, (n_samples, n_channels)).astype(np.float32)
 
 # Add peaks for different isotopes
 labels = ['Cs137'] * 4 + ['Co60'] * 3 + ['Background'] * 3
@@ -29,16 +29,11 @@ ss.spectra_state = 1
 
 # Create sources with 3-level MultiIndex
 unique_labels = list(set(labels))
-sources_data = {}
-for iso in unique_labels:
-    col_key = ('Radionuclide', iso, '')
-    sources_data[col_key] = [1.0 if label == iso else 0.0 for label in labels]
-
-sources_df = pd.DataFrame(sources_data)
-sources_df.columns = pd.MultiIndex.from_tuples(
-    sources_df.columns,
+onehot = (np.asarray(labels)[:, None] == np.asarray(unique_labels)[None, :]).astype(float)
+sources_df = pd.DataFrame(onehot, columns=pd.MultiIndex.from_tuples(
+    [('Radionuclide', iso, '') for iso in unique_labels],
     names=SampleSet.SOURCES_MULTI_INDEX_NAMES
-)
+))
 ss.sources = sources_df
 
 print(f"Training SampleSet:")
@@ -51,7 +46,7 @@ model.fit(ss, epochs=3, target_level='Isotope', verbose=False)
 print("✓ Training complete!")
 
 # Test prediction  
-test_matrix = np.random.poisson(10, (1, n_channels)).astype(float)
+test_matrix = np.random.poisson(10, (1, n_channels)).astype(np.float32)
 test_matrix[0, 60:70] += 250  # Cs137-like peak
 
 test_ss = SampleSet()
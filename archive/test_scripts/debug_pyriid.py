@@ -46,16 +46,8 @@ except Exception as e:
 
 print()
 print("4. Checking installed packages...")
-import subprocess
-result = subprocess.run(
-    [sys.executable, "-m", "pip", "list"],
-    capture_output=True,
-    text=True
-)
-if "riid" in result.stdout.lower():
-    print("   ✓ riid found in pip list")
-    for line in result.stdout.split('\n'):
-        if 'riid' in line.lower():
-            print(f"   {line}")
-else:
-    print("   ✗ riid NOT found in pip list")
+from importlib.metadata import version, PackageNotFoundError
+try:
+    print(f"   ✓ riid {version('riid')} installed")
+except PackageNotFoundError:
+    print("   ✗ riid NOT installed")
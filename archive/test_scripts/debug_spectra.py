@@ -15,13 +15,13 @@ n_channels = 128
 labels = ['Cs137'] * 5 + ['Background'] * 5
 
 # Training spectra as 2D matrix
-train_matrix = np.random.poisson(10, (n_samples, n_channels)).astype(float)
+train_matrix = np.random.poisson(10, (n_samples, n_channels)).astype(np.float32)
 for i in range(5):  # Add Cs137 peaks to first 5
     train_matrix[i, 60:70] += 250
 
 # Create training SampleSet
 train_ss = SampleSet()
-train_ss.spectra = pd.DataFrame(train_matrix)
+train_ss.spectra = pd.DataFrame(train_matrix, copy=False)
 train_ss.spectra_type = 3
 train_ss.spectra_state = 1
 
@@ -31,11 +31,9 @@ print(f"Training spectra dtype: {train_ss.spectra.values.dtype}")
 
 # Create sources
 unique_labels = list(set(labels))
-sources_data = {}
-for iso in unique_labels:
-    sources_data[('Radionuclide', iso, '')] = [1.0 if l == iso else 0.0 for l in labels]
-sources_df = pd.DataFrame(sources_data)
-sources_df.columns = pd.MultiIndex.from_tuples(sources_df.columns, names=SampleSet.SOURCES_MULTI_INDEX_NAMES)
+onehot = (np.asarray(labels)[:, None] == np.asarray(unique_labels)[None, :]).astype(float)
+sources_df = pd.DataFrame(onehot, columns=pd.MultiIndex.from_tuples(
+    [('Radionuclide', iso, '') for iso in unique_labels], names=SampleSet.SOURCES_MULTI_INDEX_NAMES))
 train_ss.sources = sources_df
 
 # Train
@@ -49,14 +47,14 @@ print("\n" + "="*60)
 print("Creating test data")
 print("="*60)
 
-test_spectrum = np.random.poisson(10, n_channels).astype(float)
+test_spectrum = np.random.poisson(10, n_channels).astype(np.float32)
 test_spectrum[60:70] += 250  # Cs137 peak
 
 # Reshape to 2D matrix like training
 test_matrix = test_spectrum.reshape(1, -1)
 
 test_ss = SampleSet()
-test_ss.spectra = pd.DataFrame(test_matrix)
+test_ss.spectra = pd.DataFrame(test_matrix, copy=False)
 test_ss.spectra_type = 3
 test_ss.spectra_state = 1
 
@@ -49,13 +49,8 @@ print("\n" + "="*60)
 print("Testing different spectra_type + spectra_state combinations")
 print("="*60)
 
-test_spectrum = np.random.poisson(5, 1024).astype(float)
-test_df = pd.DataFrame({
-    'live_time': [300.0],
-    'total_counts': [test_spectrum.sum()],
-    'counts': [test_spectrum],
-    'Isotope': ['Cs137']  # Add label
-})
+test_spectrum = np.random.poisson(5, 1024).astype(np.float32)
+test_df = pd.DataFrame(test_spectrum.reshape(1, -1))
 
 for stype in range(0, 10):
     for sstate in range(0, 5):
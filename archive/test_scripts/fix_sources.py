@@ -32,15 +32,11 @@ try:
         unique_isotopes = list(set(isotopes))
         
         # Create one-hot encoded format
-        data = {}
-        for iso in unique_isotopes:
-            data[('Isotope', iso)] = [1.0 if label == iso else 0.0 for label in isotopes]
-        
-        sources_df = pd.DataFrame(data)
-        sources_df.columns = pd.MultiIndex.from_tuples(
-            sources_df.columns,
+        onehot = (np.asarray(isotopes)[:, None] == np.asarray(unique_isotopes)[None, :]).astype(float)
+        sources_df = pd.DataFrame(onehot, columns=pd.MultiIndex.from_tuples(
+            [('Isotope', iso) for iso in unique_isotopes],
             names=names
-        )
+        ))
         
         print(f"\nCreated sources DataFrame:")
         print(sources_df)
@@ -2,11 +2,21 @@
 Spot check ML model with 25 diverse isotopes
 """
 import requests
+import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 ENDPOINT = 'http://localhost:8080/analyze/ml-identify'
 n_channels = 1024
 keV_per_channel = 3.0
+_local = threading.local()
+rng = np.random.default_rng()
+
+def _session():
+    """Per-thread requests.Session; a Session is not guaranteed to be thread-safe"""
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+    return _local.session
 
 def add_peak(counts, energy_keV, intensity=150):
     """Add a Gaussian-like peak at the specified energy"""
@@ -15,20 +25,18 @@ def add_peak(counts, energy_keV, intensity=150):
         width = 5
         start = max(0, channel - width // 2)
         end = min(n_channels, channel + width // 2 + 1)
-        counts[start:end] += np.random.poisson(intensity, end - start)
+        counts[start:end] += rng.poisson(intensity, end - start)
 
-def create_spectrum(peaks):
-    """Create a synthetic spectrum with given peaks"""
-    counts = np.random.poisson(5, n_channels).astype(float)
+def create_spectrum(counts, peaks):
+    """Add the given peaks to a background spectrum (in place)"""
     for energy, intensity in peaks:
         add_peak(counts, energy, intensity)
-    return [int(c) for c in counts]
+    return counts.tolist()
 
-def test_isotope(name, peaks, expected_isotopes):
+def test_isotope(name, spectrum, expected_isotopes):
     """Test a specific isotope pattern"""
-    spectrum = create_spectrum(peaks)
     try:
-        resp = requests.post(ENDPOINT, json={'counts': spectrum}, timeout=30)
+        resp = _session().post(ENDPOINT, json={'counts': spectrum}, timeout=30)
         if resp.status_code == 200:
             preds = resp.json().get('predictions', [])
             if preds:
@@ -97,13 +105,12 @@ test_cases = [
     ("Np-237", [(86.5, 120), (143.2, 100)], ["Np-237"]),
 ]
 
-results = []
-correct = 0
-for name, peaks, expected in test_cases:
-    result = test_isotope(name, peaks, expected)
-    results.append(result)
-    if result.startswith("✓"):
-        correct += 1
+# Build spectra up front, then overlap the HTTP round trips
+backgrounds = rng.poisson(5, (len(test_cases), n_channels))
+spectra = [create_spectrum(bg, peaks) for bg, (_, peaks, _) in zip(backgrounds, test_cases)]
+with ThreadPoolExecutor(max_workers=8) as ex:
+    results = list(ex.map(test_isotope, [c[0] for c in test_cases], spectra, [c[2] for c in test_cases]))
+correct = sum(r.startswith("✓") for r in results)
 
 for r in results:
     print(r)
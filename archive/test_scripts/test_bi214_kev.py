@@ -12,6 +12,7 @@ kev_files = [
 
 base_path = "backend/data/acquisitions/community"
 bi214_lines = [609.3, 1120.3, 1764.5]
+bi214_arr = np.array(bi214_lines)
 
 print("="*70)
 print("Bi-214 ANALYSIS - keV CALIBRATED FILES ONLY")
@@ -21,43 +22,37 @@ for filename in kev_files:
     filepath = f"{base_path}/{filename}"
     
     try:
-        counts = []
-        energies = []
-        with open(filepath, 'r') as f:
-            for line in f.readlines()[1:]:
-                parts = line.strip().split(',')
-                if len(parts) >= 2:
-                    try:
-                        counts.append(int(float(parts[0])))
-                        energies.append(float(parts[1]))
-                    except: pass
-        
-        counts_arr = np.array(counts)
-        energies_arr = np.array(energies)
+        # Counts,Energy rows; unparseable rows come back as NaN and are dropped
+        data = np.genfromtxt(filepath, delimiter=',', skip_header=1, usecols=(0, 1), invalid_raise=False)
+        data = data[~np.isnan(data).any(axis=1)]
+        counts_arr = data[:, 0].astype(np.int64)
+        energies_arr = data[:, 1]
+        max_energy = energies_arr.max()
         
         print(f"\n{'='*70}")
         print(f"FILE: {filename}")
-        print(f"Channels: {len(counts)}, Total counts: {sum(counts):,}")
-        print(f"Energy range: {min(energies):.1f} - {max(energies):.1f} keV")
+        print(f"Channels: {len(counts_arr)}, Total counts: {counts_arr.sum():,}")
+        print(f"Energy range: {energies_arr.min():.1f} - {max_energy:.1f} keV")
         
         # Check for Bi-214 peaks
         print(f"\nBi-214 Peak Regions:")
-        for line_energy in bi214_lines:
-            # Find closest channel to this energy
-            if line_energy > max(energies):
-                print(f"  {line_energy} keV: OUTSIDE DETECTOR RANGE (max {max(energies):.0f} keV)")
+        # Nearest channel to each line; the energy axis is monotonic, so bisect and check the left neighbour
+        idx = np.clip(np.searchsorted(energies_arr, bi214_arr), 1, len(energies_arr) - 1)
+        nearest = idx - ((bi214_arr - energies_arr[idx - 1]) <= (energies_arr[idx] - bi214_arr))
+        for line_energy, ch in zip(bi214_lines, nearest):
+            if line_energy > max_energy:
+                print(f"  {line_energy} keV: OUTSIDE DETECTOR RANGE (max {max_energy:.0f} keV)")
                 continue
             
-            ch = np.argmin(np.abs(energies_arr - line_energy))
             start = max(0, ch - 5)
-            end = min(len(counts), ch + 6)
+            end = min(len(counts_arr), ch + 6)
             
             region = counts_arr[start:end]
             max_idx = start + np.argmax(region)
             
             print(f"  {line_energy} keV (ch {ch}):")
             print(f"    Region counts: {list(region)}")
-            print(f"    Max: {max(region)} at {energies[max_idx]:.1f} keV")
+            print(f"    Max: {region.max()} at {energies_arr[max_idx]:.1f} keV")
         
         # Find peaks with adjusted threshold
         height_thresh = max(5, np.percentile(counts_arr, 95) * 0.2)
@@ -69,12 +64,12 @@ for filename in kev_files:
         # Check Bi-214 matches
         found_any = False
         for line_energy in bi214_lines:
-            if line_energy > max(energies):
+            if line_energy > max_energy:
                 continue
-            matches = [p for p in peaks_idx if abs(energies[p] - line_energy) <= 20]
+            matches = [p for p in peaks_idx if abs(energies_arr[p] - line_energy) <= 20]
             if matches:
                 for m in matches:
-                    print(f"  MATCH: Bi-214 {line_energy} keV = peak at {energies[m]:.1f} keV")
+                    print(f"  MATCH: Bi-214 {line_energy} keV = peak at {energies_arr[m]:.1f} keV")
                     found_any = True
         
         if not found_any:
@@ -83,7 +78,7 @@ for filename in kev_files:
             print("  Top 5 detected peaks:")
             sorted_peaks = sorted([(p, counts_arr[p]) for p in peaks_idx], key=lambda x: -x[1])[:5]
             for p, c in sorted_peaks:
-                print(f"    {energies[p]:.1f} keV, counts: {c}")
+                print(f"    {energies_arr[p]:.1f} keV, counts: {c}")
                 
     except Exception as e:
         print(f"\nERROR: {filename}: {e}")
@@ -7,23 +7,13 @@ import numpy as np
 
 # Parse the 6-hour uranium glass CSV
 csv_path = 'backend/data/acquisitions/spectrum_2025-12-12_08-41-27.csv'
-counts = []
-energies = []
+# Energy,Counts rows; header/comment/unparseable rows come back as NaN and are dropped
+data = np.genfromtxt(csv_path, delimiter=',', usecols=(0, 1), comments='#', invalid_raise=False)
+data = data[~np.isnan(data).any(axis=1)]
+energies = data[:, 0]
+counts = data[:, 1].astype(np.int64)
 
-with open(csv_path, 'r') as f:
-    for line in f:
-        line = line.strip()
-        if not line or line.startswith('#') or 'Energy' in line:
-            continue
-        parts = line.split(',')
-        if len(parts) >= 2:
-            try:
-                energies.append(float(parts[0]))
-                counts.append(int(float(parts[1])))
-            except:
-                pass
-
-print(f"Loaded: {len(counts)} channels, {sum(counts)} total counts")
+print(f"Loaded: {len(counts)} channels, {counts.sum()} total counts")
 print(f"Energy range: {energies[0]:.1f} - {energies[-1]:.1f} keV")
 print(f"Actual keV/channel: {(energies[-1] - energies[0]) / len(energies):.2f}")
 
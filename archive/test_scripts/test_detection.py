@@ -14,25 +14,15 @@ from isotope_database import identify_isotopes, identify_decay_chains
 
 # Manually parse the CSV (Energy,Counts format with header)
 csv_path = 'backend/data/acquisitions/spectrum_2025-12-12_08-41-27.csv'
-counts = []
-energies = []
+# Energy,Counts rows; header/comment/unparseable rows come back as NaN and are dropped
+data = np.genfromtxt(csv_path, delimiter=',', usecols=(0, 1), comments='#', invalid_raise=False)
+data = data[~np.isnan(data).any(axis=1)]
+energies = data[:, 0]
+counts = data[:, 1].astype(np.int64)
 
-with open(csv_path, 'r') as f:
-    for line in f:
-        line = line.strip()
-        if not line or line.startswith('#') or 'Energy' in line:
-            continue  # Skip header and comments
-        parts = line.split(',')
-        if len(parts) >= 2:
-            try:
-                energies.append(float(parts[0]))  # Energy first
-                counts.append(int(float(parts[1])))  # Counts second
-            except:
-                pass
+print(f"Loaded: {len(counts)} channels, {counts.sum()} total counts")
 
-print(f"Loaded: {len(counts)} channels, {sum(counts)} total counts")
-
-counts_arr = np.array(counts)
+counts_arr = counts
 
 # Find peaks
 peaks_idx, props = find_peaks(counts_arr, height=5, prominence=3, distance=5)